@@ -1,10 +1,28 @@
 import sqlite3
+import gzip
+import heapq
+import inspect
+import json
+import logging
+import pickle
+import os
 import random
 import string
+import sys
+import threading
+import time
+import weakref
+import zlib
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from streamlit_autorefresh import st_autorefresh
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # ----------------------------
 # Page + Theme
@@ -153,8 +171,65 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 # ----------------------------
 ICONS = ["🎩", "🔥", "🧠", "🎮", "⚔️", "🛡️", "🌙", "⚡", "❄️", "🍀", "👑", "🦄"]
 POKEAPI_BASE = "https://pokeapi.co/api/v2"
+# Bundled Pokédex, written by `python app.py build-pokedex`. PokeAPI is only
+# asked about names missing from it, unless the fallback is turned off.
+POKEDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokedex.json.gz")
+POKEDEX_FIELDS = ["id", "types", "height_dm", "weight_hg", "bst", "abilities", "color", "sprite"]
+POKEAPI_LIVE_FALLBACK = True
 GOAL_PER_PLAYER = 6
-AUTO_REFRESH_MS = 1200
+FEED_LIMIT = 30
+# Returned by a turn action that lost the race to another tab or click
+ALREADY_HANDLED = "Already handled."
+AUTO_REFRESH_MS = 1200  # the old fixed tick; only bench-refresh still uses it
+# Poll cadence by situation (see refresh_interval_ms)
+REFRESH_LOBBY_MS = 5000
+REFRESH_WAITING_MS = 3000
+REFRESH_MY_TURN_MS = 10000
+REFRESH_MIN_MS = 250
+REVEAL_DEADLINE_SLACK_MS = 300
+# Safety-net poll when room changes are pushed to the session
+FALLBACK_REFRESH_MS = 15000
+
+# Reveal scheduler
+REVEAL_MS = 5000
+REVEAL_WORKERS = 4
+REVEAL_SWEEP_SECONDS = 30
+
+# SQLite
+DB_PATH = "thenwefight.db"
+DB_BUSY_TIMEOUT_MS = 5000
+DB_POOL_MAX_IDLE = 16
+# PokeAPI HTTP client
+HTTP_POOL_SIZE = 8
+HTTP_MAX_IN_FLIGHT = HTTP_POOL_SIZE   # outbound requests at once, process-wide
+HTTP_TIMEOUT = (3.05, 6)         # (connect, read) seconds
+HTTP_LIST_TIMEOUT = (3.05, 20)   # the full name list is a large response
+HTTP_RETRIES = 3
+HTTP_BACKOFF_S = 0.3
+# Circuit breaker: once BREAKER_FAILURE_RATE of the calls in the last
+# BREAKER_WINDOW_MS fail (and at least BREAKER_MIN_CALLS were made), calls
+# fail fast for BREAKER_COOLDOWN_MS before a single probe is let through
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_MIN_CALLS = 5
+BREAKER_WINDOW_MS = 30 * 1000
+BREAKER_COOLDOWN_MS = 30 * 1000
+# Negative cache: how long a 404 / a failed fetch is remembered per record
+NEGATIVE_TTL_MISSING_MS = 10 * 60 * 1000
+NEGATIVE_TTL_ERROR_MS = 30 * 1000
+# In-process caches, per process: (max entries, approximate byte budget,
+# TTL ms or None). Past either limit the least recently used entries go
+CACHE_LIMITS = {
+    "pokemon_record": (2048, 16 * 1024 * 1024, 60 * 60 * 1000),
+    "species_color": (2048, 1024 * 1024, 60 * 60 * 1000),
+    "pokemon_names": (1, 2 * 1024 * 1024, 24 * 60 * 60 * 1000),
+    "pokeapi_negative": (4096, 2 * 1024 * 1024, None),
+}
+# On-disk PokeAPI response cache, shared by every process on the host
+API_CACHE_PATH = "pokeapi_cache.db"
+API_CACHE_TTL_MS = 24 * 60 * 60 * 1000
+# Past the TTL an entry is still served while a background refresh runs,
+# up to this age; older entries block on the refresh
+API_CACHE_MAX_STALE_MS = 7 * 24 * 60 * 60 * 1000
 
 # Modes
 MODE_DISGUISE = "Disguise Draft"
@@ -168,20 +243,175 @@ MYSTERY_MODES = [
     "Mystery: Ability",
 ]
 ALL_MODES = [MODE_DISGUISE] + MYSTERY_MODES
+# pokemon_info() fields each Mystery clue reads; only "color" needs the species
+MODE_FIELDS = {
+    "Mystery: Typing": ("types",),
+    "Mystery: Height": ("height_dm",),
+    "Mystery: Weight": ("weight_hg",),
+    "Mystery: Color": ("color",),
+    "Mystery: Pokédex #": ("id",),
+    "Mystery: Base Stat Total": ("bst",),
+    "Mystery: Ability": ("abilities",),
+}
+INFO_FIELDS = ("id", "types", "height_dm", "weight_hg", "bst", "abilities", "color")
+
+# Draft orders (see build_draft_schedule)
+DRAFT_LINEAR = "Linear"
+DRAFT_SNAKE = "Snake"
+ALL_DRAFT_ORDERS = [DRAFT_LINEAR, DRAFT_SNAKE]
+
+log = logging.getLogger("thenwefight")
 
 # ----------------------------
 # DB helpers
 # ----------------------------
+class _Lease:
+    # Holder object whose lifetime is tied to the owning thread's locals
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+class ConnectionPool:
+    """Per-thread SQLite connections: one read-write and one read-only.
+
+    Streamlit runs every rerun on a fresh script thread, so a connection is
+    leased to a thread for its lifetime and goes back to the idle list when
+    the thread exits (up to `max_idle` per kind are kept open).
+    """
+
+    def __init__(self, path: str, max_idle: int = DB_POOL_MAX_IDLE):
+        self.path = path
+        self.max_idle = max_idle
+        self._local = threading.local()
+        self._idle = {False: [], True: []}
+        self._lock = threading.Lock()
+
+        # journal_mode is persistent in the db file; set it once up front
+        conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+    def _connect(self, readonly: bool):
+        # isolation_level=None: statements autocommit unless transaction() opened one
+        conn = sqlite3.connect(
+            self.path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _acquire(self, readonly: bool):
+        with self._lock:
+            idle = self._idle[readonly]
+            conn = idle.pop() if idle else None
+        return conn or self._connect(readonly)
+
+    def _release(self, conn, readonly: bool):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle[readonly]
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def connection(self, readonly: bool = False):
+        key = "ro" if readonly else "rw"
+        lease = getattr(self._local, key, None)
+        if lease is None:
+            lease = _Lease(self._acquire(readonly))
+            weakref.finalize(lease, self._release, lease.conn, readonly)
+            setattr(self._local, key, lease)
+        return lease.conn
+
 @st.cache_resource
-def db():
-    conn = sqlite3.connect("thenwefight.db", check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+def db_pool():
+    # Cached per process, so migrations run once rather than on every rerun
+    pool = ConnectionPool(DB_PATH)
+    migrate(pool.connection())
+    return pool
+
+def db(readonly: bool = False):
+    return db_pool().connection(readonly)
+
+def is_read_sql(sql: str) -> bool:
+    words = sql.split(None, 1)
+    return bool(words) and words[0].upper() in ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
+
+_tx_state = threading.local()
+
+@contextmanager
+def transaction():
+    """Run every q() inside the block as one atomic write transaction.
+
+    Nested blocks join the outermost one, which does the single commit (or
+    the rollback if anything raises) and then runs the after_commit hooks.
+    """
+    conn = db()
+    depth = getattr(_tx_state, "depth", 0)
+    _tx_state.depth = depth + 1
+    try:
+        if depth:
+            yield conn
+            return
+        _tx_state.hooks = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        for fn in _tx_state.hooks.values():
+            fn()
+    finally:
+        _tx_state.depth = depth
+        if not depth:
+            _tx_state.hooks = {}
+
+def after_commit(key, fn):
+    """Call fn() once the current transaction commits (right away outside one).
+
+    Hooks registered under the same key within a transaction run once.
+    """
+    if getattr(_tx_state, "depth", 0):
+        _tx_state.hooks.setdefault(key, fn)
+    else:
+        fn()
+
+@contextmanager
+def read_transaction():
+    """Make the enclosed reads see one consistent snapshot of the db."""
+    if getattr(_tx_state, "depth", 0):
+        # Already inside a write transaction, which is consistent by itself
+        yield
+        return
+    conn = db(readonly=True)
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        conn.rollback()
 
 def q(sql, params=(), one=False):
-    cur = db().cursor()
-    cur.execute(sql, params)
-    db().commit()
+    # Inside transaction() everything runs on the writer so reads see the
+    # pending writes. Otherwise reads use the read-only connection and writes
+    # autocommit on their own.
+    in_tx = getattr(_tx_state, "depth", 0) > 0
+    readonly = not in_tx and is_read_sql(sql)
+    cur = db(readonly).execute(sql, params)
 
     # If the query doesn't return rows (INSERT/UPDATE/etc.)
     if cur.description is None:
@@ -195,11 +425,22 @@ def q(sql, params=(), one=False):
         return rows[0] if rows else None
     return rows
 
-def now_iso():
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+def _add_column(conn, table: str, column: str, decl: str):
+    cols = [r["name"] for r in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
 
-def init_db():
-    q("""
+def now_ms() -> int:
+    """Current time as integer epoch milliseconds, the schema's timestamp format."""
+    return time.time_ns() // 1_000_000
+
+# ----------------------------
+# Schema migrations
+# ----------------------------
+def _m001_base_schema(conn):
+    # Tables as the app originally created them, plus the columns that used
+    # to be patched in by ensure_columns() on older databases.
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS rooms (
       room_code TEXT PRIMARY KEY,
       created_at TEXT NOT NULL,
@@ -210,7 +451,7 @@ def init_db():
     )
     """)
 
-    q("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS players (
       player_id TEXT PRIMARY KEY,
       room_code TEXT NOT NULL,
@@ -223,7 +464,7 @@ def init_db():
     )
     """)
 
-    q("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS draft_order (
       room_code TEXT NOT NULL,
       pos INTEGER NOT NULL,
@@ -233,7 +474,7 @@ def init_db():
     )
     """)
 
-    q("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS rosters (
       room_code TEXT NOT NULL,
       player_id TEXT NOT NULL,
@@ -244,7 +485,7 @@ def init_db():
     )
     """)
 
-    q("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS offer (
       room_code TEXT PRIMARY KEY,
       phase TEXT NOT NULL,                 -- private_setup | public_offer | reveal
@@ -278,7 +519,7 @@ def init_db():
     )
     """)
 
-    q("""
+    conn.execute("""
     CREATE TABLE IF NOT EXISTS feed (
       room_code TEXT NOT NULL,
       at TEXT NOT NULL,
@@ -286,125 +527,1171 @@ def init_db():
     )
     """)
 
-def ensure_columns():
-    # rooms.mode
-    cols = [r["name"] for r in q("PRAGMA table_info(rooms)") or []]
-    if "mode" not in cols:
-        q("ALTER TABLE rooms ADD COLUMN mode TEXT NOT NULL DEFAULT ''")
-
-    # offer: reveal_until / next_actor / next_picker (if older DB)
-    ocols = [r["name"] for r in q("PRAGMA table_info(offer)") or []]
-    if "reveal_until" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN reveal_until TEXT NOT NULL DEFAULT ''")
-    if "next_actor_player_id" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN next_actor_player_id TEXT NOT NULL DEFAULT ''")
-    if "next_picker_player_id" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN next_picker_player_id TEXT NOT NULL DEFAULT ''")
-    if "ability1" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN ability1 TEXT NOT NULL DEFAULT ''")
-    if "ability2" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN ability2 TEXT NOT NULL DEFAULT ''")
-    if "ability3" not in ocols:
-        q("ALTER TABLE offer ADD COLUMN ability3 TEXT NOT NULL DEFAULT ''")
-
-init_db()
-ensure_columns()
+    _add_column(conn, "rooms", "mode", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "reveal_until", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "next_actor_player_id", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "next_picker_player_id", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "ability1", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "ability2", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "offer", "ability3", "TEXT NOT NULL DEFAULT ''")
+
+def _m002_hot_query_indexes(conn):
+    # rosters and draft_order are already served by their primary keys
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_players_room_joined ON players(room_code, joined_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feed_room_at ON feed(room_code, at)")
+
+def _m003_pick_counters(conn):
+    _add_column(conn, "players", "pick_count", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "rooms", "total_picks", "INTEGER NOT NULL DEFAULT 0")
+    # Picks needed to finish: draft participants x GOAL_PER_PLAYER, set at start
+    _add_column(conn, "rooms", "pick_goal", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(
+        "UPDATE rooms SET pick_goal=(SELECT COUNT(*) FROM draft_order d WHERE d.room_code=rooms.room_code) * ?",
+        (GOAL_PER_PLAYER,),
+    )
+    _rebuild_pick_counters(conn)
+
+def _m004_room_version(conn):
+    _add_column(conn, "rooms", "version", "INTEGER NOT NULL DEFAULT 0")
+
+def _m005_feed_sequence(conn):
+    # Rebuild feed with a monotonic id; second-resolution `at` can't order
+    # events written in the same second. Old rows keep insertion order.
+    conn.execute("""
+    CREATE TABLE feed_new (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      room_code TEXT NOT NULL,
+      at TEXT NOT NULL,
+      message TEXT NOT NULL
+    )
+    """)
+    conn.execute("INSERT INTO feed_new(room_code, at, message) SELECT room_code, at, message FROM feed ORDER BY rowid")
+    conn.execute("DROP TABLE feed")
+    conn.execute("ALTER TABLE feed_new RENAME TO feed")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feed_room_id ON feed(room_code, id)")
+
+def _m006_offer_phase_index(conn):
+    # For the reveal scheduler's sweep of rooms sitting in the reveal phase
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_offer_phase ON offer(phase)")
+
+def _iso_to_ms(column: str) -> str:
+    # "%Y-%m-%d %H:%M:%S" UTC text -> epoch ms; '' (never set) -> 0
+    return f"COALESCE(CAST(strftime('%s', NULLIF({column}, '')) AS INTEGER) * 1000, 0)"
+
+def _m007_epoch_ms_timestamps(conn):
+    # Timestamps become INTEGER epoch ms. TEXT affinity would turn integers
+    # back into strings, so each table is rebuilt; rows are copied in rowid
+    # order so old same-second rows keep their order.
+    conn.execute("""
+    CREATE TABLE rooms_new (
+      room_code TEXT PRIMARY KEY,
+      created_at INTEGER NOT NULL,
+      status TEXT NOT NULL,              -- lobby | drafting | done
+      host_player_id TEXT NOT NULL,
+      turn_index INTEGER NOT NULL DEFAULT 0,
+      pick_index INTEGER NOT NULL DEFAULT 0,
+      mode TEXT NOT NULL DEFAULT '',
+      total_picks INTEGER NOT NULL DEFAULT 0,
+      pick_goal INTEGER NOT NULL DEFAULT 0,
+      version INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    conn.execute(f"""
+    INSERT INTO rooms_new(room_code, created_at, status, host_player_id, turn_index, pick_index,
+                          mode, total_picks, pick_goal, version)
+    SELECT room_code, {_iso_to_ms("created_at")}, status, host_player_id, turn_index, pick_index,
+           mode, total_picks, pick_goal, version
+    FROM rooms ORDER BY rowid
+    """)
+
+    conn.execute("""
+    CREATE TABLE players_new (
+      player_id TEXT PRIMARY KEY,
+      room_code TEXT NOT NULL,
+      name TEXT NOT NULL,
+      icon TEXT NOT NULL,
+      joined_at INTEGER NOT NULL,
+      is_host INTEGER NOT NULL DEFAULT 0,
+      draft_pos INTEGER,
+      pick_count INTEGER NOT NULL DEFAULT 0,
+      FOREIGN KEY(room_code) REFERENCES rooms(room_code)
+    )
+    """)
+    conn.execute(f"""
+    INSERT INTO players_new(player_id, room_code, name, icon, joined_at, is_host, draft_pos, pick_count)
+    SELECT player_id, room_code, name, icon, {_iso_to_ms("joined_at")}, is_host, draft_pos, pick_count
+    FROM players ORDER BY rowid
+    """)
+
+    conn.execute("""
+    CREATE TABLE offer_new (
+      room_code TEXT PRIMARY KEY,
+      phase TEXT NOT NULL,                 -- private_setup | public_offer | reveal
+      actor_player_id TEXT NOT NULL,
+      picker_player_id TEXT NOT NULL,
+
+      real1 TEXT NOT NULL,
+      real2 TEXT NOT NULL,
+      real3 TEXT NOT NULL,
+
+      shown1 TEXT NOT NULL,
+      shown2 TEXT NOT NULL,
+      shown3 TEXT NOT NULL,
+
+      disguise_slot INTEGER NOT NULL DEFAULT 0,
+      disguise_name TEXT NOT NULL DEFAULT '',
+      created_at INTEGER NOT NULL,
+
+      picked_slot INTEGER NOT NULL DEFAULT 0,
+      picked_real TEXT NOT NULL DEFAULT '',
+      picked_shown TEXT NOT NULL DEFAULT '',
+      picked_at INTEGER NOT NULL DEFAULT 0,
+
+      reveal_until INTEGER NOT NULL DEFAULT 0,
+      next_actor_player_id TEXT NOT NULL DEFAULT '',
+      next_picker_player_id TEXT NOT NULL DEFAULT '',
+
+      ability1 TEXT NOT NULL DEFAULT '',
+      ability2 TEXT NOT NULL DEFAULT '',
+      ability3 TEXT NOT NULL DEFAULT ''
+    )
+    """)
+    conn.execute(f"""
+    INSERT INTO offer_new(room_code, phase, actor_player_id, picker_player_id,
+                          real1, real2, real3, shown1, shown2, shown3,
+                          disguise_slot, disguise_name, created_at,
+                          picked_slot, picked_real, picked_shown, picked_at,
+                          reveal_until, next_actor_player_id, next_picker_player_id,
+                          ability1, ability2, ability3)
+    SELECT room_code, phase, actor_player_id, picker_player_id,
+           real1, real2, real3, shown1, shown2, shown3,
+           disguise_slot, disguise_name, {_iso_to_ms("created_at")},
+           picked_slot, picked_real, picked_shown, {_iso_to_ms("picked_at")},
+           {_iso_to_ms("reveal_until")}, next_actor_player_id, next_picker_player_id,
+           ability1, ability2, ability3
+    FROM offer ORDER BY rowid
+    """)
+
+    conn.execute("""
+    CREATE TABLE feed_new (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      room_code TEXT NOT NULL,
+      at INTEGER NOT NULL,
+      message TEXT NOT NULL
+    )
+    """)
+    conn.execute(f"INSERT INTO feed_new(id, room_code, at, message) SELECT id, room_code, {_iso_to_ms('at')}, message FROM feed")
+
+    for table in ("rooms", "players", "offer", "feed"):
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_players_room_joined ON players(room_code, joined_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feed_room_id ON feed(room_code, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_offer_phase ON offer(phase)")
+
+def _m008_offer_version(conn):
+    # Bumped by every offer transition; turn actions compare-and-swap on it
+    _add_column(conn, "offer", "version", "INTEGER NOT NULL DEFAULT 0")
+
+def _m009_draft_schedule(conn):
+    # Every pick of a draft, written once by start_draft. rooms.pick_index is
+    # the next row to play and rooms.turn_index its round.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS draft_schedule (
+      room_code TEXT NOT NULL,
+      pick_index INTEGER NOT NULL,
+      round INTEGER NOT NULL,
+      actor_player_id TEXT NOT NULL,
+      picker_player_id TEXT NOT NULL,
+      PRIMARY KEY (room_code, pick_index)
+    ) WITHOUT ROWID
+    """)
+    _add_column(conn, "rooms", "draft_style", f"TEXT NOT NULL DEFAULT '{DRAFT_LINEAR}'")
+
+    # Rooms mid-draft were following the linear rotation; give them its
+    # schedule, positioned at the pick being offered now.
+    for room in conn.execute("SELECT * FROM rooms WHERE status='drafting'").fetchall():
+        order = [r["player_id"] for r in conn.execute(
+            "SELECT player_id FROM draft_order WHERE room_code=? ORDER BY pos ASC", (room["room_code"],))]
+        schedule = build_draft_schedule(order, room["mode"] or MODE_DISGUISE, DRAFT_LINEAR)
+        _write_draft_schedule(conn, room["room_code"], schedule)
+        pick_index = min(room["total_picks"], max(len(schedule) - 1, 0))
+        turn_index = schedule[pick_index][0] if schedule else 0
+        conn.execute("UPDATE rooms SET pick_index=?, turn_index=? WHERE room_code=?",
+                     (pick_index, turn_index, room["room_code"]))
+
+def _m010_pending_reveal_index(conn):
+    # The reveal sweep only wants reveals that still lead to another offer;
+    # a finished draft leaves its last offer in 'reveal' with no next picker
+    conn.execute("DROP INDEX IF EXISTS idx_offer_phase")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_offer_pending_reveal ON offer(reveal_until) "
+        "WHERE phase='reveal' AND next_picker_player_id != ''"
+    )
+
+# Ordered schema steps. Step N brings the db to PRAGMA user_version N, so
+# only ever append to this list.
+MIGRATIONS = [
+    _m001_base_schema,
+    _m002_hot_query_indexes,
+    _m003_pick_counters,
+    _m004_room_version,
+    _m005_feed_sequence,
+    _m006_offer_phase_index,
+    _m007_epoch_ms_timestamps,
+    _m008_offer_version,
+    _m009_draft_schedule,
+    _m010_pending_reveal_index,
+]
+
+def migrate(conn):
+    """Apply pending MIGRATIONS, each in its own transaction."""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, step in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                step(conn)
+                conn.execute(f"PRAGMA user_version={version}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+# players.pick_count and rooms.total_picks mirror COUNT(*) over rosters and
+# are bumped in the same transaction as every roster insert.
+PICK_COUNTER_DRIFT_SQL = """
+SELECT 'player' AS kind, p.player_id AS id, p.pick_count AS stored, COUNT(r.slot) AS actual
+FROM players p
+LEFT JOIN rosters r ON r.room_code=p.room_code AND r.player_id=p.player_id
+GROUP BY p.player_id
+HAVING stored != actual
+UNION ALL
+SELECT 'room' AS kind, rm.room_code AS id, rm.total_picks AS stored,
+       (SELECT COUNT(*) FROM rosters r WHERE r.room_code=rm.room_code) AS actual
+FROM rooms rm
+WHERE stored != actual
+"""
+
+def _rebuild_pick_counters(conn):
+    conn.execute("""
+    UPDATE players SET pick_count=(
+      SELECT COUNT(*) FROM rosters r
+      WHERE r.room_code=players.room_code AND r.player_id=players.player_id
+    )
+    """)
+    conn.execute("""
+    UPDATE rooms SET total_picks=(
+      SELECT COUNT(*) FROM rosters r WHERE r.room_code=rooms.room_code
+    )
+    """)
+
+def check_pick_counters(repair: bool = False):
+    """Return counters that disagree with rosters; rebuild them if `repair`."""
+    drift = q(PICK_COUNTER_DRIFT_SQL)
+    if drift and repair:
+        with transaction() as conn:
+            _rebuild_pick_counters(conn)
+    return drift
+
+# ----------------------------
+# Room change notifications
+# ----------------------------
+class RoomBus:
+    """In-process pub/sub of room changes, keyed by room_code.
+
+    Sessions subscribe with a waker that reruns them; bump_room_version()
+    publishes after its transaction commits. The bus also remembers which
+    sessions a wake has actually reached and the newest room version each
+    one was pushed, so push_confirmed() can tell a session whether it may
+    rely on push or must keep polling.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs = {}       # room_code -> {session_id: waker}
+        self._rooms = {}      # session_id -> room_code
+        self._woken = set()   # session_ids a wake has reached since subscribing
+        self._pushed = {}     # session_id -> newest room version pushed to it
+
+    def subscribe(self, room_code: str, session_id: str, waker):
+        with self._lock:
+            old = self._rooms.get(session_id)
+            if old and old != room_code:
+                self._drop(session_id)
+            self._rooms[session_id] = room_code
+            self._subs.setdefault(room_code, {})[session_id] = waker
+
+    def unsubscribe(self, session_id: str):
+        with self._lock:
+            self._drop(session_id)
+
+    def publish(self, room_code: str, version: int):
+        # The session that made the change reruns itself via st.rerun().
+        # Reveal-scheduler and worker threads have no script context
+        ctx = get_script_run_ctx(suppress_warning=True)
+        me = ctx.session_id if ctx else None
+        with self._lock:
+            subs = list(self._subs.get(room_code, {}).items())
+        for session_id, wake in subs:
+            woke = session_id != me and wake()
+            if session_id != me and not woke:
+                self.unsubscribe(session_id)
+                continue
+            with self._lock:
+                if self._rooms.get(session_id) != room_code:
+                    continue
+                if woke:
+                    self._woken.add(session_id)
+                self._pushed[session_id] = max(version, self._pushed.get(session_id, 0))
+
+    def push_confirmed(self, session_id: str, version) -> bool:
+        """True if a wake has reached this session and pushes brought it up to `version`.
+
+        A change from another process (or one a failed wake missed) leaves the
+        room ahead of what was pushed, and the session should poll.
+        """
+        with self._lock:
+            return (
+                session_id in self._woken
+                and version is not None
+                and self._pushed.get(session_id, -1) >= version
+            )
+
+    def _drop(self, session_id: str):
+        room_code = self._rooms.pop(session_id, None)
+        self._woken.discard(session_id)
+        self._pushed.pop(session_id, None)
+        subs = self._subs.get(room_code)
+        if subs is not None:
+            subs.pop(session_id, None)
+            if not subs:
+                del self._subs[room_code]
+
+@st.cache_resource
+def room_bus():
+    return RoomBus()
+
+def _session_waker(session_id: str):
+    # Streamlit has no public API for a server-initiated rerun, so this reaches
+    # into the runtime. Any failure just leaves the session on polling.
+    def wake():
+        try:
+            info = Runtime.instance()._session_mgr.get_active_session_info(session_id)
+            if info is None:
+                return False
+            session = info.session
+            session._event_loop.call_soon_threadsafe(session.request_rerun, None)
+            return True
+        except Exception:
+            return False
+    return wake
+
+def subscribe_to_room(room_code: str):
+    """Have room changes made in this process rerun this session."""
+    ctx = get_script_run_ctx()
+    if ctx is None or not Runtime.exists():
+        return
+    room_bus().subscribe(room_code, ctx.session_id, _session_waker(ctx.session_id))
+
+def push_confirmed(snap) -> bool:
+    """True if pushes are known to keep this session current up to `snap`.
+
+    Until a wake has actually rerun the session, or whenever the room moved
+    without a push (another process, a failed wake), the session polls.
+    """
+    ctx = get_script_run_ctx()
+    return ctx is not None and room_bus().push_confirmed(ctx.session_id, snap.version)
+
+# ----------------------------
+# Reveal scheduler
+# ----------------------------
+class RevealScheduler:
+    """Moves rooms out of the reveal phase when their reveal_until passes.
+
+    One thread per process waits on a heap of (deadline, room_code) and hands
+    due rooms to a small worker pool. lock_pick schedules its room after
+    commit; a periodic sweep of the db picks up rooms whose pick happened in
+    another (or a previous) process. advance_reveal_if_due() only moves the
+    offer version it read, so duplicate entries are harmless.
+    """
+
+    def __init__(self, workers: int = REVEAL_WORKERS, sweep_seconds: float = REVEAL_SWEEP_SECONDS):
+        self.sweep_seconds = sweep_seconds
+        self._heap = []
+        self._in_flight = set()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reveal")
+        self._thread = threading.Thread(target=self._run, name="reveal-scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, room_code: str, deadline_ms: int):
+        with self._cond:
+            heapq.heappush(self._heap, (deadline_ms, room_code))
+            self._cond.notify()
+
+    def sweep(self):
+        # Only reveals that lead to another offer; finished drafts stay in 'reveal'
+        for r in q("SELECT room_code, reveal_until FROM offer WHERE phase='reveal' AND next_picker_player_id != ''"):
+            deadline = reveal_deadline(r)
+            if deadline:
+                self.schedule(r["room_code"], deadline)
+
+    def _run(self):
+        next_sweep = now_ms()
+        while True:
+            if now_ms() >= next_sweep:
+                try:
+                    self.sweep()
+                except Exception:
+                    log.exception("Reveal sweep failed")
+                next_sweep = now_ms() + int(self.sweep_seconds * 1000)
+
+            due = []
+            with self._cond:
+                now = now_ms()
+                while self._heap and self._heap[0][0] <= now:
+                    _, room_code = heapq.heappop(self._heap)
+                    if room_code not in self._in_flight:
+                        self._in_flight.add(room_code)
+                        due.append(room_code)
+                if not due:
+                    wake_at = min(self._heap[0][0], next_sweep) if self._heap else next_sweep
+                    self._cond.wait(max(wake_at - now, 0) / 1000)
+
+            for room_code in due:
+                self._pool.submit(self._advance, room_code)
+
+    def _advance(self, room_code: str):
+        try:
+            advance_reveal_if_due(room_code)
+        except Exception:
+            log.exception("Could not advance room %s", room_code)
+        finally:
+            with self._cond:
+                self._in_flight.discard(room_code)
+
+@st.cache_resource
+def reveal_scheduler():
+    return RevealScheduler()
 
 # ----------------------------
 # Auto-refresh
 # ----------------------------
-def enable_autorefresh():
-    if st.session_state.get("room_code") and st.session_state.get("player_id"):
-        st_autorefresh(interval=AUTO_REFRESH_MS, key=f"tick_{st.session_state.room_code}")
+def refresh_interval_ms(snap, player_id: str, pushed: bool = False, now=None):
+    """Milliseconds until this session should poll again, or None to stop.
+
+    Without push, a reveal gets one poll timed to its deadline, when the
+    scheduler starts the next offer; if that poll finds the reveal still up,
+    it backs off like any other wait. Everything else backs off, to the push
+    safety net when pushes reach this session.
+    """
+    room, off = snap.room, snap.offer
+    if not room or room["status"] == "done":
+        return None
+
+    if room["status"] == "lobby" or not off:
+        interval = REFRESH_LOBBY_MS
+    elif off["phase"] == "reveal":
+        left = reveal_ms_left(off, now)
+        if left is not None and not pushed and left + REVEAL_DEADLINE_SLACK_MS > 0:
+            return max(left + REVEAL_DEADLINE_SLACK_MS, REFRESH_MIN_MS)
+        # Past the deadline the advance is running late (slow draw, failing
+        # PokeAPI, next sweep pending), so back off rather than spin
+        interval = REFRESH_WAITING_MS
+    else:
+        # Nothing moves while it is this player's own move
+        acting = off["actor_player_id"] if off["phase"] == "private_setup" else off["picker_player_id"]
+        interval = REFRESH_MY_TURN_MS if player_id == acting else REFRESH_WAITING_MS
+
+    if pushed:
+        interval = max(interval, FALLBACK_REFRESH_MS)
+    return interval
+
+def enable_autorefresh(interval_ms):
+    if interval_ms and st.session_state.get("room_code") and st.session_state.get("player_id"):
+        st_autorefresh(interval=interval_ms, key=f"tick_{st.session_state.room_code}")
+
+# ----------------------------
+# In-process caches
+# ----------------------------
+_MISSING = object()
+
+def _deep_sizeof(obj, seen):
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(x, seen) for x in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(_deep_sizeof(getattr(obj, f), seen) for f in obj.__slots__)
+    return size
+
+class BoundedCache:
+    """Thread-safe LRU cache with an entry cap, an approximate byte budget and a TTL.
+
+    Each entry's size is estimated once, on put. Past either limit the
+    least recently used entries are evicted; a value bigger than the whole
+    budget isn't kept. Hits, misses and evictions are counted for cache_stats().
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_ms=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_ms = ttl_ms
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (value, size, expires_at_ms or None)
+        self._bytes = 0
+        self._counts = Counter()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= now_ms():
+                self._drop(key)
+                self._counts["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return entry[0]
+
+    def put(self, key, value, ttl_ms=None):
+        """Store `value`; `ttl_ms` overrides the cache's TTL for this entry."""
+        seen = set()
+        size = _deep_sizeof(key, seen) + _deep_sizeof(value, seen)
+        ttl_ms = self.ttl_ms if ttl_ms is None else ttl_ms
+        expires_at = now_ms() + ttl_ms if ttl_ms else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                self._counts["too_large"] += 1
+                return
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, **self._counts}
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+@st.cache_resource
+def bounded_caches():
+    """Every BoundedCache in the process, by name."""
+    return {}
+
+def bounded_cache(name: str) -> BoundedCache:
+    """The process-wide cache `name`, created with its CACHE_LIMITS on first use."""
+    caches = bounded_caches()
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches.setdefault(name, BoundedCache(*CACHE_LIMITS[name]))
+    return cache
+
+def cached_in(name: str):
+    """Memoize fn(*args) in bounded_cache(name). Exceptions aren't cached."""
+    def decorate(fn):
+        def cached(*args):
+            cache = bounded_cache(name)
+            value = cache.get(args, _MISSING)
+            if value is _MISSING:
+                value = fn(*args)
+                cache.put(args, value)
+            return value
+        cached.__name__ = fn.__name__
+        cached.__doc__ = fn.__doc__
+        return cached
+    return decorate
+
+def cache_stats():
+    """{cache name: entries, bytes, hits, misses, evictions, ...} for every bounded cache."""
+    return {name: cache.stats() for name, cache in sorted(bounded_caches().items())}
+
+# ----------------------------
+# PokeAPI HTTP client
+# ----------------------------
+class PokeApiClientState:
+    """Per-process state of the PokeAPI client.
+
+    Module globals are re-created on every rerun of the script, so anything
+    meant to be process-wide (the in-flight cap, counters, the breaker, the
+    flight table) lives here, behind pokeapi_state().
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.counts_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(HTTP_MAX_IN_FLIGHT)
+        self.breaker = CircuitBreaker()
+        self.flights = SingleFlight()
+        self.revalidating = set()
+        self.revalidating_lock = threading.Lock()
+
+@st.cache_resource
+def pokeapi_state():
+    return PokeApiClientState()
+
+def _count_http(key: str, n: int = 1):
+    state = pokeapi_state()
+    with state.counts_lock:
+        state.counts[key] += n
+
+class _CountingRetry(Retry):
+    # urllib3 calls increment() before each retry; it raises once they run out
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new = super().increment(method, url, response, error, _pool, _stacktrace)
+        if response is not None:
+            _count_http(f"retries_status_{response.status}")
+        else:
+            _count_http(f"retries_{type(error).__name__}")
+        return new
+
+@st.cache_resource
+def http_session():
+    """Process-wide keep-alive session for PokeAPI.
+
+    Bounded, jittered retries on connection errors and 429/5xx. Retry-After
+    is not honoured, so a throttled call can't stall a rerun for long.
+    """
+    # backoff_jitter arrived in urllib3 2; requests still allows 1.26, where
+    # retries just back off without jitter
+    jitter = {}
+    if "backoff_jitter" in inspect.signature(Retry.__init__).parameters:
+        jitter["backoff_jitter"] = HTTP_BACKOFF_S
+    retry = _CountingRetry(
+        total=HTTP_RETRIES,
+        read=1,  # a read timeout already cost HTTP_TIMEOUT[1]; retry it once
+        backoff_factor=HTTP_BACKOFF_S,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+        **jitter,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class PokeApiUnavailable(requests.ConnectionError):
+    """Raised without making a request: the breaker is open or the failure is cached."""
+
+class CircuitBreaker:
+    """Fail fast while an upstream keeps failing.
+
+    Closed, every call goes through and its outcome is kept for window_ms.
+    When at least min_calls were made and failure_rate of them failed, the
+    breaker opens and allow() refuses calls for cooldown_ms. Then a single
+    probe is let through (half-open): success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_rate=BREAKER_FAILURE_RATE, min_calls=BREAKER_MIN_CALLS,
+                 window_ms=BREAKER_WINDOW_MS, cooldown_ms=BREAKER_COOLDOWN_MS):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_ms = window_ms
+        self.cooldown_ms = cooldown_ms
+        self._lock = threading.Lock()
+        self._outcomes = deque()   # (at_ms, ok)
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or now_ms() - self._opened_at >= self.cooldown_ms:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or now_ms() - self._opened_at < self.cooldown_ms:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, ok: bool):
+        now = now_ms()
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                if ok:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                    log.info("PokeAPI circuit closed")
+                else:
+                    self._opened_at = now
+                return
+            if self._opened_at is not None:
+                return   # a call that started before the breaker opened
+
+            self._outcomes.append((now, ok))
+            while self._outcomes[0][0] < now - self.window_ms:
+                self._outcomes.popleft()
+            failures = sum(1 for _, o in self._outcomes if not o)
+            if len(self._outcomes) >= self.min_calls and failures >= self.failure_rate * len(self._outcomes):
+                self._opened_at = now
+                _count_http("breaker_opened")
+                log.warning("PokeAPI circuit open: %d of the last %d calls failed", failures, len(self._outcomes))
+
+class _NoBreaker:
+    """Stands in for CircuitBreaker on calls that must not trip or obey it."""
+
+    def allow(self) -> bool:
+        return True
+
+    def record(self, ok: bool):
+        pass
+
+_NO_BREAKER = _NoBreaker()
+
+def http_get(url: str, timeout=HTTP_TIMEOUT, fail_fast: bool = True, **kwargs):
+    """GET through the shared session, keeping request/error counts for http_stats().
+
+    At most HTTP_MAX_IN_FLIGHT requests run at once; the rest queue here.
+    While the circuit breaker is open this raises PokeApiUnavailable at once.
+    Connection errors, timeouts, 429s and 5xx (after retries) count as failures.
+    With fail_fast=False the call neither consults nor feeds the breaker.
+    """
+    state = pokeapi_state()
+    breaker = state.breaker if fail_fast else _NO_BREAKER
+    if not breaker.allow():
+        _count_http("breaker_rejected")
+        raise PokeApiUnavailable(f"PokeAPI circuit open, not fetching {url}")
+    if not state.slots.acquire(blocking=False):
+        _count_http("queued")
+        state.slots.acquire()
+    try:
+        _count_http("requests")
+        r = http_session().get(url, timeout=timeout, **kwargs)
+    except requests.RequestException as e:
+        _count_http(f"errors_{type(e).__name__}")
+        breaker.record(False)
+        raise
+    except BaseException:
+        breaker.record(False)
+        raise
+    finally:
+        state.slots.release()
+    _count_http(f"status_{r.status_code}")
+    breaker.record(r.status_code < 500 and r.status_code != 429)
+    return r
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}   # key -> Future
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            _count_http("coalesced")
+            return flight.result()
+
+        try:
+            flight.set_result(fn())
+        except BaseException as e:
+            flight.set_exception(e)
+        finally:
+            with self._lock:
+                del self._flights[key]
+        return flight.result()
+
+def http_stats():
+    """Counters for metrics: requests, statuses, retries, errors and pool use."""
+    state = pokeapi_state()
+    with state.counts_lock:
+        stats = dict(state.counts)
+    stats["breaker_state"] = state.breaker.state
+    adapter = http_session().get_adapter(POKEAPI_BASE)
+    pools = adapter.poolmanager.pools
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        host = f"pool_{pool.host}"
+        stats[f"{host}_connections_opened"] = pool.num_connections
+        stats[f"{host}_requests"] = pool.num_requests
+        stats[f"{host}_idle"] = pool.pool.qsize() if pool.pool else 0
+    return stats
+
+# ----------------------------
+# PokeAPI response cache
+# ----------------------------
+class ApiCache:
+    """PokeAPI responses on disk, keyed by (endpoint, name).
+
+    A separate SQLite file, so it survives restarts and every process on the
+    host shares it without touching the game db's write lock. Entries older
+    than `ttl_ms` are revalidated with their ETag / Last-Modified (see
+    _pokeapi_fetch for how stale entries are served meanwhile).
+    """
+
+    def __init__(self, path: str, ttl_ms: int = API_CACHE_TTL_MS):
+        self.ttl_ms = ttl_ms
+        self._pool = ConnectionPool(path)
+        self._pool.connection().execute("""
+        CREATE TABLE IF NOT EXISTS api_cache (
+          endpoint TEXT NOT NULL,
+          name TEXT NOT NULL,
+          body BLOB NOT NULL,                -- zlib-compressed JSON
+          etag TEXT NOT NULL DEFAULT '',
+          last_modified TEXT NOT NULL DEFAULT '',
+          fetched_at INTEGER NOT NULL,       -- epoch ms of the last 200/304
+          PRIMARY KEY (endpoint, name)
+        )
+        """)
+
+    def get(self, endpoint: str, name: str):
+        """The cached entry as a dict with "data", "age_ms" and "fresh", or None."""
+        row = self._pool.connection(readonly=True).execute(
+            "SELECT * FROM api_cache WHERE endpoint=? AND name=?", (endpoint, name)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["data"] = json.loads(zlib.decompress(entry.pop("body")))
+        entry["age_ms"] = now_ms() - entry["fetched_at"]
+        entry["fresh"] = entry["age_ms"] < self.ttl_ms
+        return entry
+
+    def put(self, endpoint: str, name: str, data, etag: str = "", last_modified: str = ""):
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        self._pool.connection().execute("""
+        INSERT INTO api_cache(endpoint, name, body, etag, last_modified, fetched_at)
+        VALUES(?,?,?,?,?,?)
+        ON CONFLICT(endpoint, name) DO UPDATE SET
+          body=excluded.body, etag=excluded.etag,
+          last_modified=excluded.last_modified, fetched_at=excluded.fetched_at
+        """, (endpoint, name, body, etag or "", last_modified or "", now_ms()))
+
+    def touch(self, endpoint: str, name: str):
+        # A 304 confirmed the entry; start its TTL over
+        self._pool.connection().execute(
+            "UPDATE api_cache SET fetched_at=? WHERE endpoint=? AND name=?", (now_ms(), endpoint, name)
+        )
+
+@st.cache_resource
+def api_cache():
+    return ApiCache(API_CACHE_PATH)
 
 # ----------------------------
 # PokeAPI helpers
 # ----------------------------
-@st.cache_data(ttl=60 * 60 * 24)
-def fetch_all_pokemon_names():
-    url = f"{POKEAPI_BASE}/pokemon?limit=5000"
-    r = requests.get(url, timeout=20)
+def _pokeapi_get(endpoint: str, name: str, path: str = "", timeout=HTTP_TIMEOUT,
+                 allow_stale: bool = True, fail_fast: bool = True):
+    """GET `POKEAPI_BASE/path` (default endpoint/name) as JSON, or None on a 404.
+
+    Goes through the on-disk cache. Concurrent misses for the same record
+    share one fetch. Failures raise a requests.RequestException; 404s and
+    failures are remembered for a short while (see _negative_get).
+    fail_fast=False (the offline builder) skips the circuit breaker and the
+    negative cache, so every name gets its own attempt.
+    """
+    return pokeapi_state().flights.do(
+        (endpoint, name),
+        lambda: _pokeapi_fetch(endpoint, name, path or f"{endpoint}/{name}", timeout, allow_stale, fail_fast),
+    )
+
+def _pokeapi_fetch(endpoint, name, path, timeout, allow_stale, fail_fast=True):
+    # Fresh: serve. Stale but within API_CACHE_MAX_STALE_MS: serve, and
+    # revalidate in the background. Older (or a miss): fetch now.
+    cache = api_cache()
+    hit = cache.get(endpoint, name)
+    if hit and hit["fresh"]:
+        return hit["data"]
+    if hit and allow_stale and hit["age_ms"] < API_CACHE_MAX_STALE_MS:
+        _revalidate_later(endpoint, name, path, timeout, hit)
+        return hit["data"]
+
+    if not fail_fast:
+        return _pokeapi_revalidate(cache, endpoint, name, path, timeout, hit, fail_fast=False)
+
+    missing = _negative_get(endpoint, name)
+    if missing is not None:
+        if missing:
+            return None
+        raise PokeApiUnavailable(f"{path} failed recently")
+    try:
+        data = _pokeapi_revalidate(cache, endpoint, name, path, timeout, hit)
+    except requests.RequestException:
+        _negative_put(endpoint, name, missing=False)
+        raise
+    if data is None:
+        _negative_put(endpoint, name, missing=True)
+    return data
+
+# 404s and recent failures are remembered, so a dead name or a PokeAPI
+# outage isn't re-requested on every rerun
+def _negative_get(endpoint, name):
+    """True: recently a 404. False: recently failed. None: nothing remembered."""
+    return bounded_cache("pokeapi_negative").get((endpoint, name))
+
+def _negative_put(endpoint, name, missing: bool):
+    ttl = NEGATIVE_TTL_MISSING_MS if missing else NEGATIVE_TTL_ERROR_MS
+    bounded_cache("pokeapi_negative").put((endpoint, name), missing, ttl_ms=ttl)
+
+def _revalidate_later(endpoint, name, path, timeout, hit):
+    key = (endpoint, name)
+    state = pokeapi_state()
+    with state.revalidating_lock:
+        if key in state.revalidating:
+            return
+        state.revalidating.add(key)
+
+    def run():
+        try:
+            _pokeapi_revalidate(api_cache(), endpoint, name, path, timeout, hit)
+        except Exception as e:
+            # Keep serving the stale copy; the next read tries again
+            log.warning("Background refresh of %s failed: %s", path, e)
+        finally:
+            with state.revalidating_lock:
+                state.revalidating.discard(key)
+
+    _count_http("stale_served")
+    fetch_pool().submit(run)
+
+def _pokeapi_revalidate(cache, endpoint, name, path, timeout, hit, fail_fast=True):
+    headers = {}
+    if hit and hit["etag"]:
+        headers["If-None-Match"] = hit["etag"]
+    if hit and hit["last_modified"]:
+        headers["If-Modified-Since"] = hit["last_modified"]
+
+    r = http_get(f"{POKEAPI_BASE}/{path}", headers=headers, timeout=timeout, fail_fast=fail_fast)
+    if r.status_code == 304 and hit:
+        cache.touch(endpoint, name)
+        return hit["data"]
+    if r.status_code == 404:
+        return None
     r.raise_for_status()
-    names = [x["name"] for x in r.json()["results"]]
-
-    def ok(n: str) -> bool:
-        bad_substrings = [
-            "mega", "gmax", "totem", "primal",
-            "-cap", "-starter", "-cosplay",
-            "-ash", "-battle-bond",
-        ]
-        if any(b in n for b in bad_substrings):
-            return False
-        bad_suffixes = ["-mega-x", "-mega-y"]
-        if any(n.endswith(s) for s in bad_suffixes):
-            return False
-        return True
 
-    filtered = [n for n in names if ok(n)]
-    return sorted(set(filtered))
+    data = r.json()
+    cache.put(endpoint, name, data, r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""))
+    return data
+
+def _keep_pokemon_name(n: str) -> bool:
+    bad_substrings = [
+        "mega", "gmax", "totem", "primal",
+        "-cap", "-starter", "-cosplay",
+        "-ash", "-battle-bond",
+    ]
+    if any(b in n for b in bad_substrings):
+        return False
+    bad_suffixes = ["-mega-x", "-mega-y"]
+    if any(n.endswith(s) for s in bad_suffixes):
+        return False
+    return True
+
+def _live_pokemon_names(allow_stale: bool = True, fail_fast: bool = True):
+    data = _pokeapi_get("pokemon-list", "all", path="pokemon?limit=5000", timeout=HTTP_LIST_TIMEOUT,
+                        allow_stale=allow_stale, fail_fast=fail_fast)
+    if not data:
+        raise requests.HTTPError("PokeAPI did not return the Pokémon list")
+    names = [x["name"] for x in data["results"]]
+    return sorted(set(n for n in names if _keep_pokemon_name(n)))
+
+def _color_from_species(sp):
+    return ((sp or {}).get("color") or {}).get("name")
+
+class PokemonRecord:
+    """The fields the app reads about one Pokémon; the raw API JSON is dropped.
+
+    color comes from the species endpoint and is None until known. Strings
+    shared between records (types, abilities, colors) are interned.
+    """
+
+    __slots__ = tuple(POKEDEX_FIELDS)
+
+    def __init__(self, id, types, height_dm, weight_hg, bst, abilities, color, sprite):
+        self.id = id
+        self.types = tuple(sys.intern(t) for t in types or ())
+        self.height_dm = height_dm
+        self.weight_hg = weight_hg
+        self.bst = bst
+        self.abilities = tuple(sys.intern(a) for a in abilities or ())
+        self.color = sys.intern(color) if color else None
+        self.sprite = sprite or ""
+
+    @classmethod
+    def from_api(cls, data, color=None):
+        """Parse a /pokemon payload (plus the species color, if fetched)."""
+        sprites = data.get("sprites") or {}
+        other = sprites.get("other") or {}
+        sprite = (
+            (other.get("home") or {}).get("front_default")
+            or (other.get("official-artwork") or {}).get("front_default")
+            or sprites.get("front_default")
+        )
+        return cls(
+            data.get("id"),
+            [t["type"]["name"] for t in sorted(data.get("types", []), key=lambda x: x.get("slot", 99))],
+            data.get("height"),
+            data.get("weight"),
+            sum(s["base_stat"] for s in data.get("stats", []) if "base_stat" in s),
+            [a["ability"]["name"] for a in data.get("abilities", []) if a.get("ability", {}).get("name")],
+            color,
+            sprite,
+        )
+
+    @classmethod
+    def from_row(cls, fields, values):
+        row = dict(zip(fields, values))
+        return cls(*(row.get(f) for f in cls.__slots__))
 
-@st.cache_data(ttl=60 * 60)
-def pokemon_api(name: str):
-    r = requests.get(f"{POKEAPI_BASE}/pokemon/{name}", timeout=12)
-    if r.status_code != 200:
+    def row(self):
+        return [getattr(self, f) for f in self.__slots__]
+
+@st.cache_resource
+def pokedex():
+    """The bundled Pokédex as {name: PokemonRecord}, or {} if it hasn't been built.
+
+    Build it with `python app.py build-pokedex`.
+    """
+    # A bad file is logged and ignored: cache_resource doesn't cache an
+    # exception, so raising would fail every render that touches Pokémon data
+    try:
+        with gzip.open(POKEDEX_PATH, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        fields = data["fields"]
+        return {name: PokemonRecord.from_row(fields, values) for name, values in data["pokemon"].items()}
+    except FileNotFoundError:
+        return {}
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        # Truncated gzip (EOFError), bad JSON, or not the builder's format
+        log.exception("Could not read the bundled Pokédex at %s", POKEDEX_PATH)
+        return {}
+
+@cached_in("pokemon_names")
+def fetch_all_pokemon_names():
+    dex = pokedex()
+    if dex or not POKEAPI_LIVE_FALLBACK:
+        return sorted(dex)
+    return _live_pokemon_names()
+
+def pokemon_record(name: str):
+    """PokemonRecord for `name` from the bundled Pokédex, else /pokemon.
+
+    None if unknown or PokeAPI is failing right now; callers show their
+    "Unknown" / "Sprite unavailable" fallbacks instead of waiting.
+    """
+    rec = pokedex().get(name)
+    if rec or not POKEAPI_LIVE_FALLBACK:
+        return rec
+    try:
+        return _live_pokemon_record(name)
+    except requests.RequestException:
         return None
-    return r.json()
 
-@st.cache_data(ttl=60 * 60)
-def species_api(name: str):
-    r = requests.get(f"{POKEAPI_BASE}/pokemon-species/{name}", timeout=12)
-    if r.status_code != 200:
+def species_color(name: str):
+    if not POKEAPI_LIVE_FALLBACK:
+        return None
+    try:
+        return _live_species_color(name)
+    except requests.RequestException:
         return None
-    return r.json()
 
-@st.cache_data(ttl=60 * 60)
+# Failures raise out of these, so they are not cached and the next
+# lookup (after the negative-cache TTL) tries again
+@cached_in("pokemon_record")
+def _live_pokemon_record(name: str):
+    data = _pokeapi_get("pokemon", name)
+    return PokemonRecord.from_api(data) if data else None
+
+@cached_in("species_color")
+def _live_species_color(name: str):
+    return _color_from_species(_pokeapi_get("pokemon-species", name))
+
 def pokemon_sprite_url(name: str):
-    data = pokemon_api(name)
-    if not data:
-        return ""
-    home = data.get("sprites", {}).get("other", {}).get("home", {}).get("front_default")
-    if home:
-        return home
-    art = data.get("sprites", {}).get("other", {}).get("official-artwork", {}).get("front_default")
-    if art:
-        return art
-    return data.get("sprites", {}).get("front_default", "") or ""
-
-@st.cache_data(ttl=60 * 60)
-def pokemon_info(name: str):
-    data = pokemon_api(name)
-    if not data:
-        return {
-            "id": None,
-            "types": [],
-            "height_dm": None,
-            "weight_hg": None,
-            "bst": None,
-            "abilities": [],
-            "color": None,
-        }
-
-    pid = data.get("id")
-    types = [t["type"]["name"] for t in sorted(data.get("types", []), key=lambda x: x.get("slot", 99))]
-    height_dm = data.get("height")
-    weight_hg = data.get("weight")
-    bst = sum(s["base_stat"] for s in data.get("stats", []) if "base_stat" in s)
-    abilities = [a["ability"]["name"] for a in data.get("abilities", []) if a.get("ability", {}).get("name")]
-
-    sp = species_api(name)
-    color = None
-    if sp and sp.get("color", {}).get("name"):
-        color = sp["color"]["name"]
-
-    return {
-        "id": pid,
-        "types": types,
-        "height_dm": height_dm,
-        "weight_hg": weight_hg,
-        "bst": bst,
-        "abilities": abilities,
-        "color": color,
-    }
+    rec = pokemon_record(name)
+    return rec.sprite if rec else ""
+
+def pokemon_info(name: str, fields=INFO_FIELDS):
+    """The requested fields for `name`; unknown values are None (or []).
+
+    Each endpoint is only fetched when a field needs it: "color" comes from
+    the species, everything else from /pokemon.
+    """
+    info = {}
+    record_fields = [f for f in fields if f != "color"]
+    if record_fields:
+        rec = pokemon_record(name)
+        for f in record_fields:
+            value = getattr(rec, f) if rec else None
+            info[f] = list(value or ()) if f in ("types", "abilities") else value
+
+    if "color" in fields:
+        rec = pokedex().get(name)
+        info["color"] = rec.color if rec and rec.color else species_color(name)
+    return info
+
+@st.cache_resource
+def fetch_pool():
+    return ThreadPoolExecutor(max_workers=HTTP_MAX_IN_FLIGHT, thread_name_prefix="pokeapi")
+
+def _prefetch(names, *fns):
+    """Run every fn(name) on the fetch pool at once, to warm their caches.
+
+    Failures are left for the caller's own lookup to retry and report.
+    """
+    if not POKEAPI_LIVE_FALLBACK:
+        return
+    dex = pokedex()
+    futures = [fetch_pool().submit(fn, n) for n in names if n not in dex for fn in fns]
+    for f in futures:
+        try:
+            f.result()
+        except Exception:
+            pass
+
+def pokemon_info_many(names, fields=INFO_FIELDS):
+    """pokemon_info() for several names; the endpoints `fields` need are fetched concurrently."""
+    names = list(dict.fromkeys(n for n in names if n))
+    fetchers = [pokemon_record] if any(f != "color" for f in fields) else []
+    if "color" in fields:
+        fetchers.append(species_color)
+    if len(names) * len(fetchers) > 1:
+        _prefetch(names, *fetchers)
+    return {n: pokemon_info(n, fields) for n in names}
+
+def sprite_urls_many(names):
+    """pokemon_sprite_url() for several names, fetched concurrently."""
+    names = list(dict.fromkeys(n for n in names if n))
+    if len(names) > 1:
+        _prefetch(names, pokemon_sprite_url)
+    return {n: pokemon_sprite_url(n) for n in names}
 
 def pretty_name(n: str) -> str:
     parts = n.replace("-", " ").split()
@@ -421,7 +1708,9 @@ def mode_is_mystery(mode: str) -> bool:
     return mode in MYSTERY_MODES
 
 def mode_label_for_option(mode: str, real_name: str, forced_ability: str = "") -> str:
-    info = pokemon_info(real_name)
+    # A frozen ability needs no lookup at all
+    fields = () if mode == "Mystery: Ability" and forced_ability else MODE_FIELDS.get(mode, ())
+    info = pokemon_info(real_name, fields)
 
     if mode == "Mystery: Typing":
         t = info["types"] or []
@@ -478,13 +1767,23 @@ def gen_room_code():
             return code
 
 def add_feed(room_code: str, msg: str):
-    q("INSERT INTO feed(room_code, at, message) VALUES(?,?,?)", (room_code, now_iso(), msg))
+    q("INSERT INTO feed(room_code, at, message) VALUES(?,?,?)", (room_code, now_ms(), msg))
+
+def bump_room_version(room_code: str):
+    # Every mutation of a room's visible state must call this (inside its
+    # transaction) so clients know to reload
+    q("UPDATE rooms SET version=version+1 WHERE room_code=?", (room_code,))
+    after_commit(("publish", room_code), lambda: room_bus().publish(room_code, get_room_version(room_code) or 0))
+
+def get_room_version(room_code: str):
+    r = q("SELECT version FROM rooms WHERE room_code=?", (room_code,), one=True)
+    return r["version"] if r else None
 
 def get_room(room_code: str):
     return q("SELECT * FROM rooms WHERE room_code=?", (room_code,), one=True)
 
 def get_players(room_code: str):
-    return q("SELECT * FROM players WHERE room_code=? ORDER BY joined_at ASC", (room_code,))
+    return q("SELECT * FROM players WHERE room_code=? ORDER BY joined_at ASC, rowid ASC", (room_code,))
 
 def get_player(player_id: str):
     return q("SELECT * FROM players WHERE player_id=?", (player_id,), one=True)
@@ -493,12 +1792,128 @@ def get_roster(room_code: str, player_id: str):
     return q("SELECT * FROM rosters WHERE room_code=? AND player_id=? ORDER BY slot ASC", (room_code, player_id))
 
 def roster_count(room_code: str, player_id: str):
-    r = q("SELECT COUNT(*) AS c FROM rosters WHERE room_code=? AND player_id=?", (room_code, player_id), one=True)
-    return int(r["c"]) if r else 0
+    r = q("SELECT pick_count FROM players WHERE player_id=? AND room_code=?", (player_id, room_code), one=True)
+    return int(r["pick_count"]) if r else 0
 
-def total_picks(room_code: str):
-    r = q("SELECT COUNT(*) AS c FROM rosters WHERE room_code=?", (room_code,), one=True)
-    return int(r["c"]) if r else 0
+def draft_is_complete(room) -> bool:
+    return bool(room) and room["pick_goal"] > 0 and room["total_picks"] >= room["pick_goal"]
+
+def add_to_roster(room_code: str, player_id: str, slot: int, pokemon: str):
+    q("INSERT INTO rosters(room_code, player_id, slot, pokemon) VALUES(?,?,?,?)",
+      (room_code, player_id, slot, pokemon))
+    q("UPDATE players SET pick_count=pick_count+1 WHERE player_id=?", (player_id,))
+    q("UPDATE rooms SET total_picks=total_picks+1 WHERE room_code=?", (room_code,))
+
+class RoomSnapshot:
+    """Everything the UI shows for one room, read in a single transaction.
+
+    The number of queries is fixed, so a rerun costs the same no matter how
+    many players are in the room.
+    """
+
+    def __init__(self, room_code, room, players, order, rosters, offer):
+        self.room_code = room_code
+        self.room = room
+        self.players = players
+        self.order = order
+        self.rosters = rosters
+        self.offer = offer
+        self._players_by_id = {p["player_id"]: p for p in players}
+        self._lookups = {}
+
+    @property
+    def version(self):
+        return self.room["version"] if self.room else None
+
+    @property
+    def mode(self):
+        return (self.room["mode"] or MODE_DISGUISE) if self.room else MODE_DISGUISE
+
+    @property
+    def total_picks(self):
+        return self.room["total_picks"] if self.room else 0
+
+    def player(self, player_id: str):
+        return self._players_by_id.get(player_id)
+
+    def roster(self, player_id: str):
+        return self.rosters.get(player_id, [])
+
+    def roster_count(self, player_id: str):
+        p = self.player(player_id)
+        return p["pick_count"] if p else 0
+
+    # PokeAPI-derived values, resolved once per snapshot (i.e. per version)
+    def prefetch_offer(self):
+        """Resolve the current offer's sprites (and clue data) in one concurrent batch."""
+        off = self.offer
+        if not off or ("sprite", off["real1"]) in self._lookups:
+            return
+        reals = [off["real1"], off["real2"], off["real3"]]
+        if mode_is_mystery(self.mode):
+            pokemon_info_many(reals, MODE_FIELDS.get(self.mode, ()))
+        urls = sprite_urls_many(reals + [off["shown1"], off["shown2"], off["shown3"]])
+        self._lookups.update((("sprite", name), url) for name, url in urls.items() if url)
+
+    def sprite_url(self, name: str):
+        return self._lookup(("sprite", name), pokemon_sprite_url, name)
+
+    def option_label(self, name: str, forced_ability: str = ""):
+        return self._lookup(("label", name, forced_ability), mode_label_for_option, self.mode, name, forced_ability)
+
+    def _lookup(self, key, fn, *args):
+        # Fallbacks ("" / "Unknown") aren't kept, so they're retried next rerun
+        if key in self._lookups:
+            return self._lookups[key]
+        value = fn(*args)
+        if value and value != "Unknown":
+            self._lookups[key] = value
+        return value
+
+def load_room_snapshot(room_code: str) -> RoomSnapshot:
+    with read_transaction():
+        room = get_room(room_code)
+        players = get_players(room_code)
+        order = get_order(room_code)
+        rosters = {}
+        for r in q("SELECT * FROM rosters WHERE room_code=? ORDER BY player_id ASC, slot ASC", (room_code,)):
+            rosters.setdefault(r["player_id"], []).append(r)
+        offer = get_offer(room_code)
+    return RoomSnapshot(room_code, room, players, order, rosters, offer)
+
+def session_feed(snap: RoomSnapshot):
+    """This session's newest-first feed, topped up with only the unseen rows.
+
+    Every add_feed() happens in a version-bumping transaction, so the db is
+    only asked when the room version moved.
+    """
+    buf = st.session_state.get("feed_buffer")
+    if not buf or buf["room_code"] != snap.room_code:
+        buf = {"room_code": snap.room_code, "version": None, "last_id": 0, "items": deque(maxlen=FEED_LIMIT)}
+        st.session_state.feed_buffer = buf
+    if buf["version"] != snap.version:
+        rows = q(
+            "SELECT id, message FROM feed WHERE room_code=? AND id>? ORDER BY id DESC LIMIT ?",
+            (snap.room_code, buf["last_id"], FEED_LIMIT),
+        )
+        for r in reversed(rows):
+            buf["items"].append(r)
+        if rows:
+            buf["last_id"] = rows[0]["id"]
+        buf["version"] = snap.version
+    return list(reversed(buf["items"]))
+
+def room_snapshot(room_code: str) -> RoomSnapshot:
+    """This session's snapshot of the room, reloaded only when its version moved.
+
+    An unchanged room costs a single primary-key lookup per rerun.
+    """
+    cached = st.session_state.get("room_snapshot")
+    if cached and cached.room_code == room_code and cached.version == get_room_version(room_code):
+        return cached
+    snap = load_room_snapshot(room_code)
+    st.session_state.room_snapshot = snap
+    return snap
 
 def ensure_session():
     st.session_state.setdefault("room_code", "")
@@ -515,40 +1930,45 @@ def create_room(host_name: str, host_icon: str):
         if existing:
             return st.session_state.room_code, st.session_state.player_id
 
-    room_code = gen_room_code()
     host_player_id = gen_id()
-    q(
-        "INSERT INTO rooms(room_code, created_at, status, host_player_id, turn_index, pick_index, mode) VALUES(?,?,?,?,0,0,?)",
-        (room_code, now_iso(), "lobby", host_player_id, MODE_DISGUISE),
-    )
-    q(
-        "INSERT INTO players(player_id, room_code, name, icon, joined_at, is_host) VALUES(?,?,?,?,?,1)",
-        (host_player_id, room_code, host_name, host_icon, now_iso()),
-    )
-    add_feed(room_code, f"{host_icon} {host_name} created the room.")
+    with transaction():
+        room_code = gen_room_code()
+        q(
+            "INSERT INTO rooms(room_code, created_at, status, host_player_id, turn_index, pick_index, mode) VALUES(?,?,?,?,0,0,?)",
+            (room_code, now_ms(), "lobby", host_player_id, MODE_DISGUISE),
+        )
+        q(
+            "INSERT INTO players(player_id, room_code, name, icon, joined_at, is_host) VALUES(?,?,?,?,?,1)",
+            (host_player_id, room_code, host_name, host_icon, now_ms()),
+        )
+        add_feed(room_code, f"{host_icon} {host_name} created the room.")
+        bump_room_version(room_code)
     set_session_player(room_code, host_player_id)
     return room_code, host_player_id
 
 def join_room(room_code: str, name: str, icon: str):
     ensure_session()
-    room = get_room(room_code)
-    if not room:
-        return None, "Room not found."
-
-    if st.session_state.player_id and st.session_state.room_code == room_code:
-        pid = st.session_state.player_id
-        q("UPDATE players SET name=?, icon=? WHERE player_id=?", (name, icon, pid))
-        return pid, None
-
-    if st.session_state.player_id and st.session_state.room_code and st.session_state.room_code != room_code:
-        return None, f"You are already in room {st.session_state.room_code}. Refresh the page or clear session to join another."
-
-    player_id = gen_id()
-    q(
-        "INSERT INTO players(player_id, room_code, name, icon, joined_at, is_host) VALUES(?,?,?,?,?,0)",
-        (player_id, room_code, name, icon, now_iso()),
-    )
-    add_feed(room_code, f"{icon} {name} joined the room.")
+    with transaction():
+        room = get_room(room_code)
+        if not room:
+            return None, "Room not found."
+
+        if st.session_state.player_id and st.session_state.room_code == room_code:
+            pid = st.session_state.player_id
+            q("UPDATE players SET name=?, icon=? WHERE player_id=?", (name, icon, pid))
+            bump_room_version(room_code)
+            return pid, None
+
+        if st.session_state.player_id and st.session_state.room_code and st.session_state.room_code != room_code:
+            return None, f"You are already in room {st.session_state.room_code}. Refresh the page or clear session to join another."
+
+        player_id = gen_id()
+        q(
+            "INSERT INTO players(player_id, room_code, name, icon, joined_at, is_host) VALUES(?,?,?,?,?,0)",
+            (player_id, room_code, name, icon, now_ms()),
+        )
+        add_feed(room_code, f"{icon} {name} joined the room.")
+        bump_room_version(room_code)
     set_session_player(room_code, player_id)
     return player_id, None
 
@@ -566,31 +1986,57 @@ def get_order(room_code: str):
     rows = q("SELECT * FROM draft_order WHERE room_code=? ORDER BY pos ASC", (room_code,))
     return [r["player_id"] for r in rows]
 
-def next_in_order(room_code: str, current_pid: str):
-    order = get_order(room_code)
-    if not order:
-        return None
-    i = order.index(current_pid)
-    return order[(i + 1) % len(order)]
+def build_draft_schedule(order, mode: str, style: str = DRAFT_LINEAR):
+    """Every pick of a draft as (round, actor, picker), GOAL_PER_PLAYER rounds.
+
+    Each round everyone picks once; Snake reverses the order on odd rounds.
+    In Disguise the previous picker sets up the offer, never for themself,
+    and the head of the order deals first (so picks last in round one). In
+    Mystery modes each picker is their own actor.
+    """
+    disguise = mode == MODE_DISGUISE
+    seats = order[1:] + order[:1] if disguise else list(order)
+    schedule, last_pickers = [], []
+    for rnd in range(GOAL_PER_PLAYER):
+        lineup = seats[::-1] if style == DRAFT_SNAKE and rnd % 2 else seats
+        for picker in lineup:
+            if disguise:
+                actor = next((p for p in reversed(last_pickers) if p != picker), order[0])
+                last_pickers = [last_pickers[-1], picker] if last_pickers else [picker]
+            else:
+                actor = picker
+            schedule.append((rnd, actor, picker))
+    return schedule
+
+def _write_draft_schedule(conn, room_code: str, schedule):
+    conn.execute("DELETE FROM draft_schedule WHERE room_code=?", (room_code,))
+    conn.executemany(
+        "INSERT INTO draft_schedule(room_code, pick_index, round, actor_player_id, picker_player_id) VALUES(?,?,?,?,?)",
+        [(room_code, i, rnd, actor, picker) for i, (rnd, actor, picker) in enumerate(schedule)],
+    )
+
+def get_schedule_slot(room_code: str, pick_index: int):
+    return q("SELECT * FROM draft_schedule WHERE room_code=? AND pick_index=?", (room_code, pick_index), one=True)
 
 def get_offer(room_code: str):
     return q("SELECT * FROM offer WHERE room_code=?", (room_code,), one=True)
 
-def create_offer(room_code: str, actor_pid: str, picker_pid: str, mode: str):
-    # End if all full
-    players = get_players(room_code)
-    if players and all(roster_count(room_code, p["player_id"]) >= GOAL_PER_PLAYER for p in players):
-        q("UPDATE rooms SET status='done' WHERE room_code=?", (room_code,))
-        add_feed(room_code, "Draft complete.")
-        return
+def draw_offer(mode: str):
+    """Pick the three Pokémon (and frozen abilities) for the next offer.
 
+    This may hit PokeAPI, so call it before opening a transaction.
+    """
     a, b, c = sample_three_distinct()
 
+    # Warm the caches for everyone who is about to render this offer
+    infos = pokemon_info_many([a, b, c], MODE_FIELDS.get(mode, ())) if mode_is_mystery(mode) else {}
+    sprite_urls_many([a, b, c])
+
     # For ability mode, choose exactly one ability per option and freeze it
     ability1 = ability2 = ability3 = ""
     if mode == "Mystery: Ability":
         for idx, nm in enumerate([a, b, c], start=1):
-            abilities = pokemon_info(nm).get("abilities", []) or []
+            abilities = infos[nm].get("abilities", []) or []
             chosen = random.choice(abilities) if abilities else ""
             if idx == 1:
                 ability1 = chosen
@@ -599,10 +2045,41 @@ def create_offer(room_code: str, actor_pid: str, picker_pid: str, mode: str):
             else:
                 ability3 = chosen
 
+    return a, b, c, ability1, ability2, ability3
+
+def create_offer(room_code: str, actor_pid: str, picker_pid: str, mode: str, draw=None, expected_version=None):
+    """Start a new offer. With `expected_version`, only replace that revealed offer.
+
+    Returns None, or ALREADY_HANDLED if another caller moved the offer first.
+    """
+    if draw is None:
+        draw = draw_offer(mode)
+    a, b, c, ability1, ability2, ability3 = draw
+
     # Disguise mode starts at private_setup; Mystery modes start at public_offer
     phase = "private_setup" if mode == MODE_DISGUISE else "public_offer"
 
-    q("""
+    with transaction():
+        # End if all full. Advancing a reveal (expected_version) never ends the
+        # draft: _lock_pick already did on the last pick, and a stale caller
+        # must fall through to the version check and lose
+        if expected_version is None and draft_is_complete(get_room(room_code)):
+            q("UPDATE rooms SET status='done' WHERE room_code=?", (room_code,))
+            add_feed(room_code, "Draft complete.")
+            bump_room_version(room_code)
+            return None
+
+        row = _upsert_offer(room_code, phase, actor_pid, picker_pid, a, b, c, ability1, ability2, ability3, expected_version)
+        if row is None:
+            return ALREADY_HANDLED
+        bump_room_version(room_code)
+        return None
+
+def _upsert_offer(room_code, phase, actor_pid, picker_pid, a, b, c, ability1, ability2, ability3, expected_version=None):
+    # An existing row is only replaced from the reveal phase at the expected
+    # version; otherwise nothing is written and this returns None.
+    guard = "" if expected_version is None else "WHERE offer.phase='reveal' AND offer.version=?"
+    return q(f"""
     INSERT INTO offer(room_code, phase, actor_player_id, picker_player_id,
                       real1, real2, real3, shown1, shown2, shown3,
                       disguise_slot, disguise_name, created_at,
@@ -618,26 +2095,35 @@ def create_offer(room_code: str, actor_pid: str, picker_pid: str, mode: str):
       shown1=excluded.shown1, shown2=excluded.shown2, shown3=excluded.shown3,
       disguise_slot=0, disguise_name='',
       created_at=excluded.created_at,
-      picked_slot=0, picked_real='', picked_shown='', picked_at='',
-      reveal_until='',
+      picked_slot=0, picked_real='', picked_shown='', picked_at=0,
+      reveal_until=0,
       next_actor_player_id='',
       next_picker_player_id='',
       ability1=excluded.ability1,
       ability2=excluded.ability2,
-      ability3=excluded.ability3
+      ability3=excluded.ability3,
+      version=offer.version + 1
+    {guard}
+    RETURNING version
     """, (
         room_code, phase, actor_pid, picker_pid,
         a, b, c, a, b, c,
-        0, "", now_iso(),
-        0, "", "", "",
-        "", "", "",
+        0, "", now_ms(),
+        0, "", "", 0,
+        0, "", "",
         ability1, ability2, ability3
-    ))
+    ) + (() if expected_version is None else (expected_version,)), one=True)
+
+def set_public_offer(room_code: str, disguise_slot: int, disguise_name: str, expected_version=None):
+    with transaction():
+        return _set_public_offer(room_code, disguise_slot, disguise_name, expected_version)
 
-def set_public_offer(room_code: str, disguise_slot: int, disguise_name: str):
+def _set_public_offer(room_code: str, disguise_slot: int, disguise_name: str, expected_version=None):
     off = get_offer(room_code)
     if not off:
         return "No offer exists."
+    if expected_version is None:
+        expected_version = off["version"]
     if disguise_slot not in (1, 2, 3):
         return "Pick a slot to disguise."
 
@@ -653,48 +2139,76 @@ def set_public_offer(room_code: str, disguise_slot: int, disguise_name: str):
     else:
         shown3 = disguise_name
 
-    q("""
+    row = q("""
     UPDATE offer
     SET phase='public_offer',
         disguise_slot=?,
         disguise_name=?,
         shown1=?,
         shown2=?,
-        shown3=?
-    WHERE room_code=?
-    """, (disguise_slot, disguise_name, shown1, shown2, shown3, room_code))
+        shown3=?,
+        version=version + 1
+    WHERE room_code=? AND phase='private_setup' AND version=?
+    RETURNING version
+    """, (disguise_slot, disguise_name, shown1, shown2, shown3, room_code, expected_version), one=True)
+    if row is None:
+        return ALREADY_HANDLED
 
     actor = get_player(off["actor_player_id"])
     add_feed(room_code, f"{actor['icon']} {actor['name']} displayed the selections.")
+    bump_room_version(room_code)
     return None
 
-def advance_reveal_if_due(room_code: str):
-    off = get_offer(room_code)
-    if not off or off["phase"] != "reveal":
-        return
+def reveal_deadline(off):
+    """The offer's reveal_until in epoch ms, or None if no reveal is pending."""
+    return off["reveal_until"] or None
 
-    until = (off["reveal_until"] or "").strip()
-    if not until:
-        return
+def reveal_ms_left(off, now=None):
+    """Milliseconds until the offer's reveal ends (<= 0 once due), or None."""
+    deadline = reveal_deadline(off)
+    if deadline is None:
+        return None
+    return deadline - (now_ms() if now is None else now)
 
-    try:
-        reveal_dt = datetime.strptime(until, "%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return
+def advance_reveal_if_due(room_code: str, now=None):
+    """Start the next offer once the reveal window is over.
 
-    if datetime.utcnow() < reveal_dt:
-        return
+    The new offer only replaces the version read here, so concurrent callers
+    (in this process or another) advance each reveal exactly once. Returns
+    True if this call moved the room on.
+    """
+    off = get_offer(room_code)
+    if not off or off["phase"] != "reveal":
+        return False
+
+    left = reveal_ms_left(off, now)
+    if left is None or left > 0:
+        return False
 
     new_actor = (off["next_actor_player_id"] or "").strip()
     new_picker = (off["next_picker_player_id"] or "").strip()
 
     # If no next ids, just keep it stable (game ended)
     if not new_actor or not new_picker:
-        return
+        return False
 
     room = get_room(room_code)
     mode = (room["mode"] or MODE_DISGUISE) if room else MODE_DISGUISE
-    create_offer(room_code, new_actor, new_picker, mode)
+    draw = draw_offer(mode)
+
+    return create_offer(room_code, new_actor, new_picker, mode, draw=draw, expected_version=off["version"]) is None
+
+def set_room_mode(room_code: str, mode: str):
+    with transaction():
+        q("UPDATE rooms SET mode=? WHERE room_code=?", (mode, room_code))
+        add_feed(room_code, f"Host set mode to **{mode}**.")
+        bump_room_version(room_code)
+
+def set_draft_style(room_code: str, style: str):
+    with transaction():
+        q("UPDATE rooms SET draft_style=? WHERE room_code=?", (style, room_code))
+        add_feed(room_code, f"Host set draft order to **{style}**.")
+        bump_room_version(room_code)
 
 def start_draft(room_code: str):
     room = get_room(room_code)
@@ -703,29 +2217,45 @@ def start_draft(room_code: str):
 
     players = get_players(room_code)
     if len(players) < 2:
-        add_feed(room_code, "Need at least 2 players to start.")
+        with transaction():
+            add_feed(room_code, "Need at least 2 players to start.")
+            bump_room_version(room_code)
         return
 
-    assign_draft_order(room_code)
-    q("UPDATE rooms SET status='drafting', turn_index=0, pick_index=0 WHERE room_code=?", (room_code,))
-    add_feed(room_code, "Game started. Drafting begins!")
-
-    order = get_order(room_code)
     mode = (room["mode"] or MODE_DISGUISE)
+    draw = draw_offer(mode)
+
+    with transaction() as conn:
+        # Re-check under the write lock in case the host double-clicked
+        room = get_room(room_code)
+        if not room or room["status"] != "lobby":
+            return
+
+        assign_draft_order(room_code)
+        schedule = build_draft_schedule(get_order(room_code), mode, room["draft_style"] or DRAFT_LINEAR)
+        _write_draft_schedule(conn, room_code, schedule)
+        q(
+            "UPDATE rooms SET status='drafting', turn_index=0, pick_index=0, pick_goal=? WHERE room_code=?",
+            (len(schedule), room_code),
+        )
+        add_feed(room_code, f"Game started ({room['draft_style'] or DRAFT_LINEAR} order). Drafting begins!")
+        bump_room_version(room_code)
 
-    if mode == MODE_DISGUISE:
-        actor = order[0]
-        picker = order[1] if len(order) > 1 else order[0]
-        create_offer(room_code, actor, picker, mode)
-    else:
-        # Mystery modes: each player picks their own offer sequentially
-        current = order[0]
-        create_offer(room_code, current, current, mode)
+        _, actor, picker = schedule[0]
+        create_offer(room_code, actor, picker, mode, draw=draw)
+
+def lock_pick(room_code: str, picker_pid: str, picked_slot: int, expected_version=None):
+    with transaction():
+        return _lock_pick(room_code, picker_pid, picked_slot, expected_version)
 
-def lock_pick(room_code: str, picker_pid: str, picked_slot: int):
+def _lock_pick(room_code: str, picker_pid: str, picked_slot: int, expected_version=None):
     off = get_offer(room_code)
     if not off:
         return "No offer exists."
+    if expected_version is None:
+        expected_version = off["version"]
+    elif off["version"] != expected_version:
+        return ALREADY_HANDLED
     if off["phase"] != "public_offer":
         return "Not in pick phase yet."
     if picker_pid != off["picker_player_id"]:
@@ -739,79 +2269,72 @@ def lock_pick(room_code: str, picker_pid: str, picked_slot: int):
     picked_real = real_map[picked_slot]
     picked_shown = shown_map[picked_slot]
 
-    # Add to roster
     current_count = roster_count(room_code, picker_pid)
     if current_count >= GOAL_PER_PLAYER:
         return "You already have 6 Pokémon."
-    slot = current_count + 1
-    q("INSERT INTO rosters(room_code, player_id, slot, pokemon) VALUES(?,?,?,?)",
-      (room_code, picker_pid, slot, picked_real))
+
+    # Claim the pick; whoever moved the offer first wins
+    picked_at = now_ms()
+    reveal_until = picked_at + REVEAL_MS
+    claimed = q("""
+    UPDATE offer
+    SET phase='reveal',
+        picked_slot=?,
+        picked_real=?,
+        picked_shown=?,
+        picked_at=?,
+        reveal_until=?,
+        version=version + 1
+    WHERE room_code=? AND phase='public_offer' AND picker_player_id=? AND version=?
+    RETURNING version
+    """, (
+        picked_slot, picked_real, picked_shown, picked_at,
+        reveal_until, room_code, picker_pid, expected_version
+    ), one=True)
+    if claimed is None:
+        return ALREADY_HANDLED
+
+    # Add to roster
+    add_to_roster(room_code, picker_pid, current_count + 1, picked_real)
 
     room = get_room(room_code)
     mode = (room["mode"] or MODE_DISGUISE) if room else MODE_DISGUISE
 
     picker = get_player(picker_pid)
 
-    # Decide next turn NOW but don't create next offer until reveal ends
-    order = get_order(room_code)
-    if not order:
-        return None
+    # Advance the schedule NOW but don't create next offer until reveal ends
+    nxt = get_schedule_slot(room_code, room["pick_index"] + 1)
+    if nxt:
+        q("UPDATE rooms SET pick_index=pick_index+1, turn_index=? WHERE room_code=?", (nxt["round"], room_code))
+        new_actor, new_picker = nxt["actor_player_id"], nxt["picker_player_id"]
+    else:
+        new_actor = new_picker = ""
 
-    # Determine next ids based on mode
     if mode == MODE_DISGUISE:
-        new_actor = picker_pid
-        new_picker = next_in_order(room_code, new_actor)
-        # Skip players already full
-        safety = 0
-        while new_picker and roster_count(room_code, new_picker) >= GOAL_PER_PLAYER and safety < 50:
-            new_picker = next_in_order(room_code, new_picker)
-            safety += 1
-
         # Feed message includes lie/truth (fine since reveal starts immediately)
         lied = (picked_real != picked_shown)
         verdict = "✅ TRUTH" if not lied else "🕵️ LIE REVEALED"
         add_feed(room_code, f"{picker['icon']} {picker['name']} picked **{pretty_name(picked_shown)}** — {verdict} (was {pretty_name(picked_real)}).")
 
     else:
-        # Mystery: the same player is picker; next is next in order (who still needs picks)
-        new_actor = next_in_order(room_code, picker_pid)
-        new_picker = new_actor
-        safety = 0
-        while new_picker and roster_count(room_code, new_picker) >= GOAL_PER_PLAYER and safety < 200:
-            new_picker = next_in_order(room_code, new_picker)
-            new_actor = new_picker
-            safety += 1
-
         # In mystery, "shown" is not a lie; we keep picked_shown = picked_real
         # Feed can reveal during reveal phase window
         add_feed(room_code, f"{picker['icon']} {picker['name']} picked **{pretty_name(picked_real)}**.")
 
-    # End condition (still show reveal for 5s)
-    players = get_players(room_code)
-    done = players and all(roster_count(room_code, p["player_id"]) >= GOAL_PER_PLAYER for p in players)
-    if done:
+    # End condition (still show the reveal)
+    if draft_is_complete(room):
         q("UPDATE rooms SET status='done' WHERE room_code=?", (room_code,))
         add_feed(room_code, "Draft complete.")
         new_actor = ""
         new_picker = ""
 
-    reveal_until = (datetime.utcnow() + timedelta(seconds=5)).strftime("%Y-%m-%d %H:%M:%S")
+    bump_room_version(room_code)
 
-    q("""
-    UPDATE offer
-    SET phase='reveal',
-        picked_slot=?,
-        picked_real=?,
-        picked_shown=?,
-        picked_at=?,
-        reveal_until=?,
-        next_actor_player_id=?,
-        next_picker_player_id=?
-    WHERE room_code=?
-    """, (
-        picked_slot, picked_real, picked_shown, now_iso(),
-        reveal_until, new_actor, new_picker, room_code
-    ))
+    if new_picker:
+        after_commit(("reveal", room_code), lambda: reveal_scheduler().schedule(room_code, reveal_until))
+
+    q("UPDATE offer SET next_actor_player_id=?, next_picker_player_id=? WHERE room_code=?",
+      (new_actor, new_picker, room_code))
 
     return None
 
@@ -826,8 +2349,8 @@ def card(title: str, body_html: str):
     </div>
     """, unsafe_allow_html=True)
 
-def render_poke_card(name: str, label: str):
-    url = pokemon_sprite_url(name)
+def render_poke_card(snap: RoomSnapshot, name: str, label: str):
+    url = snap.sprite_url(name)
     disp = pretty_name(name)
     if url:
         st.markdown('<div class="poke-img">', unsafe_allow_html=True)
@@ -837,17 +2360,17 @@ def render_poke_card(name: str, label: str):
     else:
         st.markdown(f'<div class="poke-img"><div class="poke-name">{label}: {disp}</div><div class="small-muted">Sprite unavailable</div></div>', unsafe_allow_html=True)
 
-def render_mystery_card(mode: str, real_name: str, forced_ability: str, slot_label: str):
-    label = mode_label_for_option(mode, real_name, forced_ability=forced_ability)
+def render_mystery_card(snap: RoomSnapshot, real_name: str, forced_ability: str, slot_label: str):
+    label = snap.option_label(real_name, forced_ability=forced_ability)
     st.markdown('<div class="poke-img">', unsafe_allow_html=True)
     st.markdown(f"<div class='badge pill-warn'>{slot_label}</div>", unsafe_allow_html=True)
     st.markdown(f"<div style='font-size:28px; font-weight:900; margin-top:10px;'>{label}</div>", unsafe_allow_html=True)
     st.markdown("<div class='small-muted' style='margin-top:6px;'>Pokémon hidden until reveal</div>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
-def render_disguise_reveal(picked_shown: str, picked_real: str):
-    shown_url = pokemon_sprite_url(picked_shown)
-    real_url = pokemon_sprite_url(picked_real)
+def render_disguise_reveal(snap: RoomSnapshot, picked_shown: str, picked_real: str):
+    shown_url = snap.sprite_url(picked_shown)
+    real_url = snap.sprite_url(picked_real)
     lied = (picked_shown != picked_real)
 
     if not shown_url:
@@ -892,7 +2415,7 @@ def render_disguise_reveal(picked_shown: str, picked_real: str):
             unsafe_allow_html=True
         )
 
-def render_mystery_reveal_three(mode: str, off):
+def render_mystery_reveal_three(snap: RoomSnapshot, off):
     # Reveal all three with selected flashing green
     a, b, c = off["real1"], off["real2"], off["real3"]
     chosen = off["picked_slot"]
@@ -905,9 +2428,9 @@ def render_mystery_reveal_three(mode: str, off):
     ]
     for i, (slot, nm, abil) in enumerate(items):
         with cols[i]:
-            url = pokemon_sprite_url(nm)
+            url = snap.sprite_url(nm)
             disp = pretty_name(nm)
-            label = mode_label_for_option(mode, nm, forced_ability=abil)
+            label = snap.option_label(nm, forced_ability=abil)
 
             cls = "poke-img pick-flash-green" if slot == chosen else "poke-img"
             st.markdown(f"<div class='{cls}'>", unsafe_allow_html=True)
@@ -924,10 +2447,382 @@ def render_mystery_reveal_three(mode: str, off):
 
             st.markdown("</div>", unsafe_allow_html=True)
 
+# ----------------------------
+# Live panels
+# ----------------------------
+def fragment_every(interval_ms):
+    return interval_ms / 1000 if interval_ms else None
+
+def offer_panel(rc: str, pid: str):
+    """Header stats and the current offer card (a fragment on the fast cadence).
+
+    It is the page's only poll: once the room version moves past the one the
+    page rendered, the whole app reruns so the feed, rosters and cadence
+    catch up together.
+    """
+    snap = room_snapshot(rc)
+    if snap.version != st.session_state.get("page_version"):
+        st.rerun()
+
+    room = snap.room
+    players = snap.players
+    off = snap.offer
+    if off and room and room["status"] == "drafting":
+        snap.prefetch_offer()
+
+    # Header stats
+    total = snap.total_picks
+    # Once the draft starts it ends at the goal fixed then, however many join later
+    if room and room["status"] != "lobby" and room["pick_goal"]:
+        max_total = room["pick_goal"]
+    else:
+        max_total = len(players) * GOAL_PER_PLAYER
+    my_count = snap.roster_count(pid)
+    mode = snap.mode
+
+    c1, c2, c3, c4 = st.columns([0.32, 0.22, 0.23, 0.23])
+    with c1:
+        st.markdown("## 🧠 Drafting" if room and room["status"] != "lobby" else "## 🧩 Lobby")
+    with c2:
+        st.markdown(f"<div class='badge'>Players: <b>{len(players)}</b></div>", unsafe_allow_html=True)
+    with c3:
+        st.markdown(f"<div class='badge pill-good'>Your picks: <b>{my_count}</b> / {GOAL_PER_PLAYER}</div>", unsafe_allow_html=True)
+    with c4:
+        st.markdown(f"<div class='badge pill-good'>Total picks: <b>{total}</b> / {max_total}</div>", unsafe_allow_html=True)
+
+    st.write("")
+    st.markdown("<hr/>", unsafe_allow_html=True)
+
+    if not room or room["status"] == "lobby":
+        card("Waiting Room", "<div class='small-muted'>Host can start the game once everyone joins.</div>")
+
+    elif room["status"] == "done":
+        card("Draft Complete", "<div class='small-muted'>Everyone finished their 6 picks.</div>")
+
+    else:
+        if not off:
+            card("Current Offer", "<div class='small-muted'>No offer yet.</div>")
+        else:
+            actor = snap.player(off["actor_player_id"])
+            picker = snap.player(off["picker_player_id"])
+
+            st.markdown("<div class='block-card'>", unsafe_allow_html=True)
+            st.markdown("### 📌 Current Offer")
+            st.markdown(
+                f"<div class='badge'>Mode: <b>{mode}</b></div>"
+                f"<div class='badge'>Actor: <b>{actor['icon']} {actor['name']}</b></div>"
+                f"<div class='badge'>Picker: <b>{picker['icon']} {picker['name']}</b></div>",
+                unsafe_allow_html=True
+            )
+            st.write("")
+
+            # ---- DISGUISE MODE ----
+            if mode == MODE_DISGUISE:
+                if off["phase"] == "private_setup":
+                    if pid != off["actor_player_id"]:
+                        st.info("Waiting for the current actor to prepare and display the selections…")
+                    else:
+                        st.markdown(
+                            "<div class='small-muted'>Only you can see the real Pokémon right now. Choose one slot to disguise, then display to everyone.</div>",
+                            unsafe_allow_html=True
+                        )
+                        st.write("")
+
+                        colA, colB, colC = st.columns(3)
+                        with colA:
+                            render_poke_card(snap, off["real1"], "Slot 1")
+                        with colB:
+                            render_poke_card(snap, off["real2"], "Slot 2")
+                        with colC:
+                            render_poke_card(snap, off["real3"], "Slot 3")
+
+                        st.write("")
+                        disguise_slot = st.radio("Which slot do you want to disguise?", [1, 2, 3], horizontal=True)
+                        all_names = fetch_all_pokemon_names()
+                        disguise_name = st.selectbox(
+                            "Disguise it as (autocomplete)",
+                            options=all_names,
+                            index=all_names.index("pikachu") if "pikachu" in all_names else 0
+                        )
+
+                        if st.button("✅ Display selections to everyone", use_container_width=True):
+                            err = set_public_offer(rc, disguise_slot, disguise_name, off["version"])
+                            if err and err != ALREADY_HANDLED:
+                                st.error(err)
+                            else:
+                                st.rerun()
+
+                elif off["phase"] == "public_offer":
+                    st.success("Selections are displayed to everyone.")
+                    st.write("")
+
+                    colA, colB, colC = st.columns(3)
+                    with colA:
+                        render_poke_card(snap, off["shown1"], "Slot 1")
+                    with colB:
+                        render_poke_card(snap, off["shown2"], "Slot 2")
+                    with colC:
+                        render_poke_card(snap, off["shown3"], "Slot 3")
+
+                    st.write("")
+                    st.markdown("#### ✅ Pick Phase")
+
+                    if pid != off["picker_player_id"]:
+                        st.info(f"Waiting for {picker['icon']} {picker['name']} to pick…")
+                    else:
+                        picked_slot = st.radio("Pick one:", [1, 2, 3], horizontal=True)
+                        if st.button("Lock in pick", use_container_width=True):
+                            err = lock_pick(rc, pid, picked_slot, off["version"])
+                            if err and err != ALREADY_HANDLED:
+                                st.error(err)
+                            else:
+                                st.rerun()
+
+                elif off["phase"] == "reveal":
+                    # ONLY picked image + animation
+                    st.warning(f"🎭 Reveal phase ({REVEAL_MS / 1000:g} seconds)…")
+                    st.write("")
+                    render_disguise_reveal(snap, off["picked_shown"], off["picked_real"])
+
+            # ---- MYSTERY MODES ----
+            else:
+                if off["phase"] == "public_offer":
+                    st.success("Offer is displayed to everyone (mystery clues only).")
+                    st.write("")
+
+                    colA, colB, colC = st.columns(3)
+                    with colA:
+                        render_mystery_card(snap, off["real1"], off.get("ability1", ""), "Slot 1")
+                    with colB:
+                        render_mystery_card(snap, off["real2"], off.get("ability2", ""), "Slot 2")
+                    with colC:
+                        render_mystery_card(snap, off["real3"], off.get("ability3", ""), "Slot 3")
+
+                    st.write("")
+                    st.markdown("#### ✅ Pick Phase")
+
+                    if pid != off["picker_player_id"]:
+                        st.info(f"Waiting for {picker['icon']} {picker['name']} to pick…")
+                    else:
+                        picked_slot = st.radio("Pick one:", [1, 2, 3], horizontal=True)
+                        if st.button("Lock in pick", use_container_width=True):
+                            err = lock_pick(rc, pid, picked_slot, off["version"])
+                            if err and err != ALREADY_HANDLED:
+                                st.error(err)
+                            else:
+                                st.rerun()
+
+                elif off["phase"] == "reveal":
+                    st.warning(f"🎭 Reveal phase ({REVEAL_MS / 1000:g} seconds)… all 3 are revealed, selected flashes green.")
+                    st.write("")
+                    render_mystery_reveal_three(snap, off)
+
+            st.markdown("</div>", unsafe_allow_html=True)
+
+def feed_panel(rc: str):
+    snap = room_snapshot(rc)
+    st.markdown("### 📣 Public Feed (everyone sees)")
+    feed = session_feed(snap)
+    if not feed:
+        st.markdown("<div class='small-muted'>No events yet.</div>", unsafe_allow_html=True)
+    else:
+        for item in feed:
+            st.markdown(f"<div class='feed-item'>{item['message']}</div>", unsafe_allow_html=True)
+
+def rosters_panel(rc: str):
+    snap = room_snapshot(rc)
+    players = snap.players
+    st.markdown("### 🧾 Rosters")
+    for p in players:
+        roster = snap.roster(p["player_id"])
+        st.markdown(f"**{p['icon']} {p['name']}**  <span class='small-muted'>({len(roster)}/{GOAL_PER_PLAYER})</span>", unsafe_allow_html=True)
+        if roster:
+            for rr in roster:
+                st.markdown(f"- {pretty_name(rr['pokemon'])}")
+        else:
+            st.markdown("<div class='small-muted'>No picks yet.</div>", unsafe_allow_html=True)
+        st.write("")
+
+# ----------------------------
+# CLI (python app.py <command>)
+# ----------------------------
+def bench_refresh(players: str = "4", minutes: str = "10"):
+    """Count reruns for a simulated Disguise draft: fixed tick vs adaptive cadence.
+
+    Each pick is 10 s of private setup, 10 s of picking and the 5 s reveal;
+    the draft runs for `minutes` or until every roster is full. Every rerun
+    is assumed to restart the client's poll timers. A session reruns the
+    whole page on a push, on the FALLBACK_REFRESH_MS safety-net tick, or when
+    its offer fragment (polling at refresh_interval_ms) sees a new version.
+    """
+    n, horizon = int(players), int(minutes) * 60_000
+    pids = [f"p{i}" for i in range(n)]
+    room = {"status": "drafting", "mode": MODE_DISGUISE, "version": 0, "total_picks": 0, "pick_goal": n * GOAL_PER_PLAYER}
+
+    # Timeline of (start_ms, snapshot) states; each transition is a mutation
+    states, t = [], 0
+    for i in range(min(n * GOAL_PER_PLAYER, horizon // 25_000)):
+        actor, picker = pids[i % n], pids[(i + 1) % n]
+        base = {"actor_player_id": actor, "picker_player_id": picker, "reveal_until": 0}
+        for phase, dur in (("private_setup", 10_000), ("public_offer", 10_000), ("reveal", 5_000)):
+            off = dict(base, phase=phase)
+            if phase == "reveal":
+                off["reveal_until"] = t + dur
+            states.append((t, RoomSnapshot("BENCH", room, [], pids, {}, off)))
+            t += dur
+    states.append((t, RoomSnapshot("BENCH", dict(room, status="done"), [], pids, {}, None)))
+    end = min(t, horizon)
+
+    def state_at(ms):
+        return sum(1 for start, _ in states if start <= ms) - 1
+
+    def simulate(pushed):
+        """(full-page runs, offer-fragment runs) over every session."""
+        pages = fragments = 0
+        for pid in pids:
+            ms, shown = 0, 0   # shown: the state the page last rendered
+            pages += 1
+            while True:
+                snap = states[shown][1]
+                done = snap.room["status"] == "done"
+                tick = end if done else ms + FALLBACK_REFRESH_MS
+                wait = refresh_interval_ms(snap, pid, pushed=pushed, now=ms)
+                poll = ms + wait if wait else end
+                push = states[shown + 1][0] if pushed and shown + 1 < len(states) else end
+                # Run whatever fires first; a fragment poll that finds nothing new
+                # just re-arms itself
+                while poll < min(tick, push) and state_at(poll) == shown:
+                    fragments += 1
+                    wait = refresh_interval_ms(snap, pid, pushed=pushed, now=poll)
+                    poll = poll + wait if wait else end
+                ms = min(tick, push, poll)
+                if ms >= end:
+                    break
+                if ms == poll and poll < min(tick, push):
+                    fragments += 1   # it saw the new version and reruns the page
+                pages += 1
+                shown = state_at(ms)
+        return pages, fragments
+
+    before = n * (end // AUTO_REFRESH_MS + 1)
+    print(f"Simulated draft: {n} players, {end / 60_000:.1f} min, {len(states) - 1} room states")
+    print(f"  {'fixed ' + str(AUTO_REFRESH_MS) + ' ms tick':<22}{before:6d} reruns")
+    for label, pushed in (("adaptive polling", False), ("adaptive + push", True)):
+        pages, fragments = simulate(pushed)
+        print(f"  {label:<22}{pages + fragments:6d} reruns ({pages} full page, {fragments} offer fragment)")
+
+def build_pokedex(workers: str = "8", path: str = POKEDEX_PATH):
+    """Snapshot every draftable Pokémon from PokeAPI into the bundled Pokédex.
+
+    Only the fields the app reads are kept, as one row per name under a
+    shared field list. Species are looked up by species name, so alternate
+    forms get a color too. Rerun to refresh; the file is replaced atomically.
+    A name that still fails after retries is reported and left out, so one
+    bad response doesn't abort the whole build; rerun to fill the gaps. The
+    builder bypasses the circuit breaker and the negative cache for this.
+    """
+    names = _live_pokemon_names(allow_stale=False, fail_fast=False)
+    species_of = lambda name, data: (data.get("species") or {}).get("name") or name
+    failed = {"pokemon": [], "pokemon-species": []}
+
+    def fetch(endpoint, name):
+        try:
+            return _pokeapi_get(endpoint, name, allow_stale=False, fail_fast=False)
+        except requests.RequestException as e:
+            log.warning("Could not fetch %s/%s: %s", endpoint, name, e)
+            failed[endpoint].append(name)
+            return None
+
+    with ThreadPoolExecutor(max_workers=int(workers)) as pool:
+        mons = dict(zip(names, pool.map(lambda n: fetch("pokemon", n), names)))
+        species_names = sorted({species_of(n, d) for n, d in mons.items() if d})
+        species = dict(zip(species_names, pool.map(lambda n: fetch("pokemon-species", n), species_names)))
+
+    records, missing = {}, []
+    for name, data in mons.items():
+        if not data:
+            if name not in failed["pokemon"]:
+                missing.append(name)
+            continue
+        color = _color_from_species(species.get(species_of(name, data)))
+        records[name] = PokemonRecord.from_api(data, color).row()
+
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(
+            {"format": 1, "built_at": now_ms(), "source": POKEAPI_BASE, "fields": POKEDEX_FIELDS, "pokemon": records},
+            f, separators=(",", ":"),
+        )
+    os.replace(tmp, path)
+
+    print(f"Wrote {len(records)} Pokémon to {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+    if missing:
+        print(f"  skipped {len(missing)} PokeAPI did not return: {', '.join(missing[:10])}")
+    if failed["pokemon"]:
+        names_failed = sorted(failed["pokemon"])
+        print(f"  skipped {len(names_failed)} that failed to fetch: {', '.join(names_failed[:10])}")
+    if failed["pokemon-species"]:
+        names_failed = sorted(failed["pokemon-species"])
+        print(f"  no color for forms of {len(names_failed)} species that failed to fetch: {', '.join(names_failed[:10])}")
+
+def memory_report(limit: str = "0"):
+    """Per-process cache memory after warming the Pokédex: raw JSON vs PokemonRecord.
+
+    Fetches every draftable Pokémon (or the first `limit`) through the disk
+    cache. "Raw" is what st.cache_data used to hold, the pickled /pokemon
+    and species responses; "records" is the deep size of the PokemonRecord
+    objects, with shared interned strings counted once.
+    """
+    names = fetch_all_pokemon_names()
+    if int(limit):
+        names = names[:int(limit)]
+
+    def fetch(name):
+        return _pokeapi_get("pokemon", name), _pokeapi_get("pokemon-species", name)
+
+    raw_bytes, record_bytes, count, seen = 0, 0, 0, set()
+    for data, sp in fetch_pool().map(fetch, names):
+        if not data:
+            continue
+        count += 1
+        raw_bytes += len(pickle.dumps(data)) + len(pickle.dumps(sp))
+        record_bytes += _deep_sizeof(PokemonRecord.from_api(data, _color_from_species(sp)), seen)
+
+    mib = 1024 * 1024
+    print(f"Warmed {count} Pokémon")
+    print(f"  raw JSON (pickled)  {raw_bytes / mib:9.2f} MiB  ({raw_bytes // max(count, 1):,} B each)")
+    print(f"  PokemonRecord       {record_bytes / mib:9.2f} MiB  ({record_bytes // max(count, 1):,} B each)")
+    print(f"  saved               {(raw_bytes - record_bytes) / mib:9.2f} MiB")
+
+    # The same names through the app's own lookups, to show the bounded caches
+    pokemon_info_many(names)
+    print("In-process caches (bytes are estimates)")
+    for name, stats in cache_stats().items():
+        print(f"  {name:18} " + "  ".join(f"{k}={v:,}" for k, v in stats.items()))
+
+CLI_COMMANDS = {
+    "bench-refresh": bench_refresh,
+    "build-pokedex": build_pokedex,
+    "memory-report": memory_report,
+}
+
+if __name__ == "__main__" and not Runtime.exists() and sys.argv[1:2] and sys.argv[1] in CLI_COMMANDS:
+    CLI_COMMANDS[sys.argv[1]](*sys.argv[2:])
+    sys.exit(0)
+
 # ----------------------------
 # Main App
 # ----------------------------
 ensure_session()
+reveal_scheduler()
+
+# One snapshot per rerun; every panel below renders from it
+snap = None
+pushed = False
+if st.session_state.room_code and st.session_state.player_id:
+    subscribe_to_room(st.session_state.room_code)
+    snap = room_snapshot(st.session_state.room_code)
+    pushed = push_confirmed(snap)
 
 left, right = st.columns([0.33, 0.67], gap="large")
 
@@ -938,9 +2833,9 @@ with left:
 
     mode_ui = st.radio("Mode", ["Host", "Join"], horizontal=True)
 
-    if st.session_state.room_code and st.session_state.player_id:
+    if snap:
         st.markdown(f'<div class="badge pill-good">Room: {st.session_state.room_code}</div>', unsafe_allow_html=True)
-        me = get_player(st.session_state.player_id)
+        me = snap.player(st.session_state.player_id)
         if me:
             st.markdown(f'<div class="badge">You: {me["player_id"]}</div>', unsafe_allow_html=True)
         st.write("")
@@ -981,22 +2876,28 @@ with left:
     rc = st.session_state.room_code
     pid = st.session_state.player_id
 
-    if rc and pid:
-        room = get_room(rc)
-        players = get_players(rc)
+    if snap:
+        room = snap.room
+        players = snap.players
 
         st.markdown("### Room")
         st.markdown(f'<div class="badge pill-good">Room: {rc}</div>', unsafe_allow_html=True)
 
-        me = get_player(pid)
+        me = snap.player(pid)
 
         # Host picks mode BEFORE start (and can change until started)
         if room and me and me["is_host"] == 1 and room["status"] == "lobby":
             cur_mode = room["mode"] or MODE_DISGUISE
             picked_mode = st.selectbox("Game mode", ALL_MODES, index=ALL_MODES.index(cur_mode) if cur_mode in ALL_MODES else 0)
             if picked_mode != cur_mode:
-                q("UPDATE rooms SET mode=? WHERE room_code=?", (picked_mode, rc))
-                add_feed(rc, f"Host set mode to **{picked_mode}**.")
+                set_room_mode(rc, picked_mode)
+                st.rerun()
+
+            cur_style = room["draft_style"] or DRAFT_LINEAR
+            picked_style = st.radio("Draft order", ALL_DRAFT_ORDERS, horizontal=True,
+                                    index=ALL_DRAFT_ORDERS.index(cur_style) if cur_style in ALL_DRAFT_ORDERS else 0)
+            if picked_style != cur_style:
+                set_draft_style(rc, picked_style)
                 st.rerun()
 
             if st.button("Start Game", use_container_width=True):
@@ -1005,18 +2906,19 @@ with left:
 
         if room and room["mode"]:
             st.markdown(f"<div class='badge'>Mode: <b>{room['mode']}</b></div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='badge'>Order: <b>{room['draft_style'] or DRAFT_LINEAR}</b></div>", unsafe_allow_html=True)
 
         st.write("")
-        ar = st.toggle("Auto-refresh", value=True)
-        if ar:
-            enable_autorefresh()
+        auto_refresh = st.toggle("Auto-refresh", value=True)
+        if auto_refresh and room and room["status"] != "done":
+            enable_autorefresh(FALLBACK_REFRESH_MS)
 
         st.write("")
         st.markdown("### Players")
         for p in players:
             host_tag = " 👑" if p["is_host"] == 1 else ""
             st.markdown(
-                f"- {p['icon']} **{p['name']}**{host_tag}  <span class='small-muted'>({roster_count(rc, p['player_id'])}/{GOAL_PER_PLAYER})</span>",
+                f"- {p['icon']} **{p['name']}**{host_tag}  <span class='small-muted'>({snap.roster_count(p['player_id'])}/{GOAL_PER_PLAYER})</span>",
                 unsafe_allow_html=True
             )
 
@@ -1025,160 +2927,16 @@ with right:
     rc = st.session_state.room_code
     pid = st.session_state.player_id
 
-    if not rc or not pid:
+    if not snap:
         card("Lobby", "<div class='small-muted'>Create or join a room to begin.</div>")
     else:
-        room = get_room(rc)
-        players = get_players(rc)
-
-        # advance reveal if due, then re-read offer
-        advance_reveal_if_due(rc)
-        off = get_offer(rc)
+        # Only the offer panel polls, as a fragment; the rest of the page
+        # reruns on a push, an action, a version change the offer panel saw,
+        # or the slow safety-net poll
+        offer_every = refresh_interval_ms(snap, pid, pushed=pushed) if auto_refresh else None
+        st.session_state.page_version = snap.version
 
-        # Header stats
-        total = total_picks(rc)
-        max_total = len(players) * GOAL_PER_PLAYER
-        my_count = roster_count(rc, pid)
-        mode = (room["mode"] or MODE_DISGUISE) if room else MODE_DISGUISE
-
-        c1, c2, c3, c4 = st.columns([0.32, 0.22, 0.23, 0.23])
-        with c1:
-            st.markdown("## 🧠 Drafting" if room and room["status"] != "lobby" else "## 🧩 Lobby")
-        with c2:
-            st.markdown(f"<div class='badge'>Players: <b>{len(players)}</b></div>", unsafe_allow_html=True)
-        with c3:
-            st.markdown(f"<div class='badge pill-good'>Your picks: <b>{my_count}</b> / {GOAL_PER_PLAYER}</div>", unsafe_allow_html=True)
-        with c4:
-            st.markdown(f"<div class='badge pill-good'>Total picks: <b>{total}</b> / {max_total}</div>", unsafe_allow_html=True)
-
-        st.write("")
-        st.markdown("<hr/>", unsafe_allow_html=True)
-
-        if not room or room["status"] == "lobby":
-            card("Waiting Room", "<div class='small-muted'>Host can start the game once everyone joins.</div>")
-
-        elif room["status"] == "done":
-            card("Draft Complete", "<div class='small-muted'>Everyone finished their 6 picks.</div>")
-
-        else:
-            if not off:
-                card("Current Offer", "<div class='small-muted'>No offer yet.</div>")
-            else:
-                actor = get_player(off["actor_player_id"])
-                picker = get_player(off["picker_player_id"])
-
-                st.markdown("<div class='block-card'>", unsafe_allow_html=True)
-                st.markdown("### 📌 Current Offer")
-                st.markdown(
-                    f"<div class='badge'>Mode: <b>{mode}</b></div>"
-                    f"<div class='badge'>Actor: <b>{actor['icon']} {actor['name']}</b></div>"
-                    f"<div class='badge'>Picker: <b>{picker['icon']} {picker['name']}</b></div>",
-                    unsafe_allow_html=True
-                )
-                st.write("")
-
-                # ---- DISGUISE MODE ----
-                if mode == MODE_DISGUISE:
-                    if off["phase"] == "private_setup":
-                        if pid != off["actor_player_id"]:
-                            st.info("Waiting for the current actor to prepare and display the selections…")
-                        else:
-                            st.markdown(
-                                "<div class='small-muted'>Only you can see the real Pokémon right now. Choose one slot to disguise, then display to everyone.</div>",
-                                unsafe_allow_html=True
-                            )
-                            st.write("")
-
-                            colA, colB, colC = st.columns(3)
-                            with colA:
-                                render_poke_card(off["real1"], "Slot 1")
-                            with colB:
-                                render_poke_card(off["real2"], "Slot 2")
-                            with colC:
-                                render_poke_card(off["real3"], "Slot 3")
-
-                            st.write("")
-                            disguise_slot = st.radio("Which slot do you want to disguise?", [1, 2, 3], horizontal=True)
-                            all_names = fetch_all_pokemon_names()
-                            disguise_name = st.selectbox(
-                                "Disguise it as (autocomplete)",
-                                options=all_names,
-                                index=all_names.index("pikachu") if "pikachu" in all_names else 0
-                            )
-
-                            if st.button("✅ Display selections to everyone", use_container_width=True):
-                                err = set_public_offer(rc, disguise_slot, disguise_name)
-                                if err:
-                                    st.error(err)
-                                else:
-                                    st.rerun()
-
-                    elif off["phase"] == "public_offer":
-                        st.success("Selections are displayed to everyone.")
-                        st.write("")
-
-                        colA, colB, colC = st.columns(3)
-                        with colA:
-                            render_poke_card(off["shown1"], "Slot 1")
-                        with colB:
-                            render_poke_card(off["shown2"], "Slot 2")
-                        with colC:
-                            render_poke_card(off["shown3"], "Slot 3")
-
-                        st.write("")
-                        st.markdown("#### ✅ Pick Phase")
-
-                        if pid != off["picker_player_id"]:
-                            st.info(f"Waiting for {picker['icon']} {picker['name']} to pick…")
-                        else:
-                            picked_slot = st.radio("Pick one:", [1, 2, 3], horizontal=True)
-                            if st.button("Lock in pick", use_container_width=True):
-                                err = lock_pick(rc, pid, picked_slot)
-                                if err:
-                                    st.error(err)
-                                else:
-                                    st.rerun()
-
-                    elif off["phase"] == "reveal":
-                        # ONLY picked image + animation
-                        st.warning("🎭 Reveal phase (5 seconds)…")
-                        st.write("")
-                        render_disguise_reveal(off["picked_shown"], off["picked_real"])
-
-                # ---- MYSTERY MODES ----
-                else:
-                    if off["phase"] == "public_offer":
-                        st.success("Offer is displayed to everyone (mystery clues only).")
-                        st.write("")
-
-                        colA, colB, colC = st.columns(3)
-                        with colA:
-                            render_mystery_card(mode, off["real1"], off.get("ability1", ""), "Slot 1")
-                        with colB:
-                            render_mystery_card(mode, off["real2"], off.get("ability2", ""), "Slot 2")
-                        with colC:
-                            render_mystery_card(mode, off["real3"], off.get("ability3", ""), "Slot 3")
-
-                        st.write("")
-                        st.markdown("#### ✅ Pick Phase")
-
-                        if pid != off["picker_player_id"]:
-                            st.info(f"Waiting for {picker['icon']} {picker['name']} to pick…")
-                        else:
-                            picked_slot = st.radio("Pick one:", [1, 2, 3], horizontal=True)
-                            if st.button("Lock in pick", use_container_width=True):
-                                err = lock_pick(rc, pid, picked_slot)
-                                if err:
-                                    st.error(err)
-                                else:
-                                    st.rerun()
-
-                    elif off["phase"] == "reveal":
-                        st.warning("🎭 Reveal phase (5 seconds)… all 3 are revealed, selected flashes green.")
-                        st.write("")
-                        render_mystery_reveal_three(mode, off)
-
-                st.markdown("</div>", unsafe_allow_html=True)
+        st.fragment(offer_panel, run_every=fragment_every(offer_every))(rc, pid)
 
         st.write("")
         st.markdown("<hr/>", unsafe_allow_html=True)
@@ -1187,22 +2945,7 @@ with right:
         fcol, rcol = st.columns([0.60, 0.40], gap="large")
 
         with fcol:
-            st.markdown("### 📣 Public Feed (everyone sees)")
-            feed = q("SELECT * FROM feed WHERE room_code=? ORDER BY at DESC LIMIT 30", (rc,))
-            if not feed:
-                st.markdown("<div class='small-muted'>No events yet.</div>", unsafe_allow_html=True)
-            else:
-                for item in feed:
-                    st.markdown(f"<div class='feed-item'>{item['message']}</div>", unsafe_allow_html=True)
+            feed_panel(rc)
 
         with rcol:
-            st.markdown("### 🧾 Rosters")
-            for p in players:
-                roster = get_roster(rc, p["player_id"])
-                st.markdown(f"**{p['icon']} {p['name']}**  <span class='small-muted'>({len(roster)}/{GOAL_PER_PLAYER})</span>", unsafe_allow_html=True)
-                if roster:
-                    for rr in roster:
-                        st.markdown(f"- {pretty_name(rr['pokemon'])}")
-                else:
-                    st.markdown("<div class='small-muted'>No picks yet.</div>", unsafe_allow_html=True)
-                st.write("")
+            rosters_panel(rc)
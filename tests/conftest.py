@@ -0,0 +1,103 @@
+import importlib.util
+import os
+import pathlib
+import random
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """app.py loaded as a module (Streamlit runs it in bare mode).
+
+    The working directory stays in a temp dir, so the default db and the
+    PokeAPI cache the import (and the reveal scheduler's sweep) open don't
+    land in the repo.
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("cwd"))
+    try:
+        spec = importlib.util.spec_from_file_location("app", ROOT / "app.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.db_pool()   # settle the import-time pool before tests swap it
+        yield module
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def db(app, tmp_path, monkeypatch):
+    """A freshly migrated database for one test."""
+    monkeypatch.setattr(app, "DB_PATH", str(tmp_path / "test.db"))
+    app.db_pool.clear()
+    app.db_pool()
+    yield app
+    app.db_pool.clear()
+
+
+class _NoScheduler:
+    def schedule(self, room_code, deadline_ms):
+        pass
+
+
+@pytest.fixture
+def offline(db, monkeypatch):
+    """The migrated db, with offers drawn without PokeAPI and reveals advanced by the test."""
+    monkeypatch.setattr(db, "draw_offer", lambda mode: ("bulbasaur", "charmander", "squirtle", "", "", ""))
+    monkeypatch.setattr(db, "reveal_scheduler", _NoScheduler)
+    return db
+
+
+@pytest.fixture
+def start_room(offline):
+    """start_room(room_code, n_players): a Disguise room with its draft started; returns the player ids."""
+    app = offline
+
+    def start(room_code, n_players):
+        pids = [f"{room_code.lower()}{i}" for i in range(n_players)]
+        with app.transaction():
+            app.q("INSERT INTO rooms(room_code, created_at, status, host_player_id, mode) VALUES(?,?,?,?,?)",
+                  (room_code, app.now_ms(), "lobby", pids[0], app.MODE_DISGUISE))
+            for i, pid in enumerate(pids):
+                app.q("INSERT INTO players(player_id, room_code, name, icon, joined_at, is_host) VALUES(?,?,?,?,?,?)",
+                      (pid, room_code, pid, app.ICONS[i % len(app.ICONS)], app.now_ms(), int(i == 0)))
+        app.start_draft(room_code)
+        return pids
+
+    return start
+
+
+@pytest.fixture
+def play_draft(offline):
+    """play_draft(room_code, each_turn=None): one session renders and acts until the draft is done."""
+    app = offline
+
+    def play(room_code, each_turn=None):
+        while app.get_room(room_code)["status"] != "done":
+            snap = app.room_snapshot(room_code)
+            app.session_feed(snap)
+            if each_turn:
+                each_turn()
+            off = snap.offer
+            if off["phase"] == "private_setup":
+                app.set_public_offer(room_code, random.randint(1, 3), "ditto", off["version"])
+            elif off["phase"] == "public_offer":
+                app.lock_pick(room_code, off["picker_player_id"], random.randint(1, 3), off["version"])
+            else:
+                app.advance_reveal_if_due(room_code, now=off["reveal_until"])
+        app.session_feed(app.room_snapshot(room_code))
+
+    return play
+
+
+class ScheduleRecorder:
+    """Stands in for a RevealScheduler, to call its sweep() without the thread."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, room_code, deadline_ms):
+        self.scheduled.append(room_code)
@@ -0,0 +1,61 @@
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+ROOM = "STRS"
+THREADS = 16
+PLAYERS = 4
+
+
+def _race(app):
+    """Every client fires whatever action the offer allows, with the version it read."""
+    outcomes, lock = Counter(), threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def client():
+        start.wait()
+        while app.get_room(ROOM)["status"] != "done":
+            off = app.get_offer(ROOM)
+            if off["phase"] == "private_setup":
+                action, err = "set_public_offer", app.set_public_offer(ROOM, random.randint(1, 3), "ditto", off["version"])
+            elif off["phase"] == "public_offer":
+                action, err = "lock_pick", app.lock_pick(ROOM, off["picker_player_id"], random.randint(1, 3), off["version"])
+            else:
+                moved = app.advance_reveal_if_due(ROOM, now=off["reveal_until"])
+                action, err = "advance_reveal", None if moved else app.ALREADY_HANDLED
+            with lock:
+                outcomes[action, err or "ok"] += 1
+
+    workers = [threading.Thread(target=client) for _ in range(THREADS)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return outcomes
+
+
+# Lost races only show up now and then, so run the draft a few times
+@pytest.mark.parametrize("attempt", range(5))
+def test_concurrent_clients_apply_each_transition_once(offline, start_room, attempt):
+    app = offline
+    pids = start_room(ROOM, PLAYERS)
+
+    outcomes = _race(app)
+
+    room = app.get_room(ROOM)
+    goal = room["pick_goal"]
+    assert goal == PLAYERS * app.GOAL_PER_PLAYER
+    for pid in pids:
+        assert [r["slot"] for r in app.get_roster(ROOM, pid)] == list(range(1, app.GOAL_PER_PLAYER + 1))
+    assert not app.check_pick_counters()
+    assert room["total_picks"] == goal
+
+    assert outcomes["set_public_offer", "ok"] == goal
+    assert outcomes["lock_pick", "ok"] == goal
+    assert outcomes["advance_reveal", "ok"] == goal - 1
+
+    feed = Counter(r["message"] for r in app.q("SELECT message FROM feed WHERE room_code=?", (ROOM,)))
+    assert feed["Draft complete."] == 1
+    assert sum(n for msg, n in feed.items() if " picked **" in msg) == goal
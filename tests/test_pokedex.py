@@ -0,0 +1,36 @@
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def dex_path(app, tmp_path, monkeypatch):
+    path = tmp_path / "pokedex.json.gz"
+    monkeypatch.setattr(app, "POKEDEX_PATH", str(path))
+    app.pokedex.clear()
+    yield path
+    app.pokedex.clear()
+
+
+def _write(path, data):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_reads_the_builders_format(app, dex_path):
+    fields = app.POKEDEX_FIELDS
+    _write(dex_path, {"format": 1, "fields": fields, "pokemon": {"pikachu": [None] * len(fields)}})
+    assert list(app.pokedex()) == ["pikachu"]
+
+
+def test_a_truncated_file_is_ignored(app, dex_path):
+    _write(dex_path, {"format": 1, "fields": [], "pokemon": {f"p{i}": [] for i in range(500)}})
+    data = dex_path.read_bytes()
+    dex_path.write_bytes(data[: len(data) // 2])
+    assert app.pokedex() == {}
+
+
+def test_a_file_in_another_format_is_ignored(app, dex_path):
+    _write(dex_path, {"format": 1, "records": {}})
+    assert app.pokedex() == {}
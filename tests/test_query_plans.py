@@ -0,0 +1,34 @@
+from conftest import ScheduleRecorder
+
+ROOM = "PLAN"
+
+
+def test_room_queries_use_an_index(offline, start_room, play_draft, monkeypatch):
+    app = offline
+    executed = set()
+    real_q = app.q
+
+    def recording_q(sql, params=(), one=False):
+        executed.add(sql)
+        return real_q(sql, params, one)
+
+    # Record the exact statements the helpers run, rather than a copy of them
+    monkeypatch.setattr(app, "q", recording_q)
+    start_room(ROOM, 2)
+    sweep = lambda: app.RevealScheduler.sweep(ScheduleRecorder())
+    play_draft(ROOM, each_turn=sweep)
+
+    conn = app.db(readonly=True)
+    # Scanning a partial index only visits the rows it was built for
+    tables = [r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    partial = {i["name"] for t in tables for i in conn.execute(f"PRAGMA index_list({t})") if i["partial"]}
+    bad = []
+    for sql in sorted(executed):
+        params = (None,) * sql.count("?")
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row["detail"]
+            partial_scan = any(detail.endswith(f"INDEX {name}") for name in partial)
+            if (detail.startswith("SCAN") and not partial_scan) or "TEMP B-TREE" in detail:
+                bad.append(f"{' '.join(sql.split())}  ->  {detail}")
+    assert len(executed) > 10
+    assert not bad, "queries without a usable index:\n" + "\n".join(bad)
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+NOW = 1_000_000
+
+
+def _reveal(reveal_until):
+    room = {"status": "drafting"}
+    offer = {"phase": "reveal", "reveal_until": reveal_until, "actor_player_id": "a", "picker_player_id": "b"}
+    return SimpleNamespace(room=room, offer=offer)
+
+
+def test_a_pending_reveal_polls_just_after_its_deadline(app):
+    snap = _reveal(NOW + 2000)
+    assert app.refresh_interval_ms(snap, "a", now=NOW) == 2000 + app.REVEAL_DEADLINE_SLACK_MS
+
+
+def test_an_overdue_reveal_backs_off(app):
+    snap = _reveal(NOW - 5000)
+    assert app.refresh_interval_ms(snap, "a", now=NOW) == app.REFRESH_WAITING_MS
@@ -0,0 +1,17 @@
+from conftest import ScheduleRecorder
+
+
+def test_sweep_skips_finished_drafts(offline, start_room, play_draft):
+    app = offline
+    start_room("DONE", 2)
+    play_draft("DONE")
+    assert app.get_offer("DONE")["phase"] == "reveal"
+
+    start_room("LIVE", 2)
+    off = app.get_offer("LIVE")
+    app.set_public_offer("LIVE", 1, "ditto", off["version"])
+    app.lock_pick("LIVE", off["picker_player_id"], 1, off["version"] + 1)
+
+    recorder = ScheduleRecorder()
+    app.RevealScheduler.sweep(recorder)
+    assert recorder.scheduled == ["LIVE"]
@@ -0,0 +1,32 @@
+def test_push_is_confirmed_only_after_a_wake_reaches_the_session(app):
+    bus = app.RoomBus()
+    bus.subscribe("ROOM", "s1", lambda: True)
+    assert not bus.push_confirmed("s1", 1)
+
+    bus.publish("ROOM", 2)
+    assert bus.push_confirmed("s1", 2)
+    # The room moved without a push, e.g. from another process
+    assert not bus.push_confirmed("s1", 3)
+
+
+def test_a_failed_wake_drops_the_session_back_to_polling(app):
+    bus = app.RoomBus()
+    bus.subscribe("ROOM", "s1", lambda: True)
+    bus.publish("ROOM", 1)
+    assert bus.push_confirmed("s1", 1)
+
+    bus.subscribe("ROOM", "s1", lambda: False)
+    bus.publish("ROOM", 2)
+    assert not bus.push_confirmed("s1", 2)
+
+    # Subscribing again isn't enough; only a wake that works confirms push
+    bus.subscribe("ROOM", "s1", lambda: False)
+    assert not bus.push_confirmed("s1", 1)
+
+
+def test_switching_rooms_forgets_what_was_pushed(app):
+    bus = app.RoomBus()
+    bus.subscribe("ROOM", "s1", lambda: True)
+    bus.publish("ROOM", 5)
+    bus.subscribe("OTHR", "s1", lambda: True)
+    assert not bus.push_confirmed("s1", 1)